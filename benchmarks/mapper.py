@@ -0,0 +1,90 @@
+"""
+Micro-benchmark of the generic mapper functions against the functions
+generated for each element class. Runs without a Gremlin Server:
+
+    python benchmarks/mapper.py [--number N]
+"""
+
+import argparse
+import timeit
+
+from gremlin_python.process.traversal import Cardinality, T
+from gremlin_python.structure.graph import Edge, Vertex
+
+from goblin import element, mapper, properties
+
+
+class Person(element.Vertex):
+    name = properties.Property(properties.String)
+    age = properties.Property(properties.Integer, db_name='person__age')
+    email = properties.Property(properties.String)
+    score = properties.Property(properties.Float)
+    active = properties.Property(properties.Boolean)
+    nicknames = element.VertexProperty(
+        properties.String, card=Cardinality.list_)
+
+
+class Knows(element.Edge):
+    notes = properties.Property(properties.String)
+    weight = properties.Property(properties.Float)
+    since = properties.Property(properties.Integer)
+
+
+def vertex_props():
+    return {'id': 1, 'label': 'person', 'name': ['dave'], 'person__age': [35],
+            'email': ['dave@example.com'], 'score': [0.5],
+            'active': [True], 'nicknames': ['d', 'davey']}
+
+
+def edge_props():
+    return {T.id: 3, T.label: 'knows', 'notes': 'friends', 'weight': 0.8,
+            'since': 2001}
+
+
+def bench(label, generic, generated, number):
+    generic_time = timeit.timeit(generic, number=number)
+    generated_time = timeit.timeit(generated, number=number)
+    print('{:<18} generic {:8.2f} us  generated {:8.2f} us  x{:.2f}'.format(
+        label, generic_time / number * 1e6, generated_time / number * 1e6,
+        generic_time / generated_time))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--number', type=int, default=20000)
+    number = parser.parse_args().number
+
+    vertex = Vertex(1, 'person')
+    edge = Edge(3, Vertex(1), 'knows', Vertex(2))
+    vertex_mapping = Person.__mapping__
+    edge_mapping = Knows.__mapping__
+
+    bench('vertex to ogm',
+          lambda: mapper.map_vertex_to_ogm(
+              vertex, vertex_props(), Person(), mapping=vertex_mapping),
+          lambda: vertex_mapping.mapper_func(
+              vertex, vertex_props(), Person()),
+          number)
+    bench('edge to ogm',
+          lambda: mapper.map_edge_to_ogm(
+              edge, edge_props(), Knows(Person(), Person()),
+              mapping=edge_mapping),
+          lambda: edge_mapping.mapper_func(
+              edge, edge_props(), Knows(Person(), Person())),
+          number)
+
+    person = vertex_mapping.mapper_func(vertex, vertex_props(), Person())
+    knows = edge_mapping.mapper_func(
+        edge, edge_props(), Knows(Person(), Person()))
+    bench('vertex props to db',
+          lambda: mapper.map_props_to_db(person, vertex_mapping),
+          lambda: vertex_mapping.props_func(person),
+          number)
+    bench('edge props to db',
+          lambda: mapper.map_props_to_db(knows, edge_mapping),
+          lambda: edge_mapping.props_func(knows),
+          number)
+
+
+if __name__ == '__main__':
+    main()
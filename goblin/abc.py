@@ -77,6 +77,35 @@ class DataType(abc.ABC):
             val = vp
         return val
 
+    def load_vertex_prop(self, val, card, vertex_prop, data_type):
+        """
+        Build vertex properties for a value loaded from the db, like
+        :py:meth:`validate_vertex_prop` but without validating the value
+        """
+        if card == Cardinality.list_:
+            if not isinstance(val, list):
+                val = [val]
+            vertex_props = []
+            for v in val:
+                vp = vertex_prop(data_type, card=card)
+                vp.value = v
+                vertex_props.append(vp)
+            return manager.ListVertexPropertyManager(
+                data_type, vertex_prop, card, vertex_props)
+        if card == Cardinality.set_:
+            if not isinstance(val, (list, set)):
+                val = [val]
+            vertex_props = set()
+            for v in val:
+                vp = vertex_prop(data_type, card=card)
+                vp.value = v
+                vertex_props.add(vp)
+            return manager.SetVertexPropertyManager(
+                data_type, vertex_prop, card, vertex_props)
+        vp = vertex_prop(data_type)
+        vp.value = val
+        return vp
+
 
 class BaseProperty:
     """Abstract base class that implements the property interface"""
@@ -6,7 +6,7 @@ import logging
 
 import aiogremlin # type: ignore
 
-from goblin import element, provider, session
+from goblin import driver, element, exception, provider, session
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +22,11 @@ class Goblin:
     :param asyncio.BaseEventLoop loop: Event loop implementation
     :param dict features: Vendor implementation specific database features
     :param dict config: Config parameters for application
+    :param goblin.cache.ElementCache element_cache: Optional cache of
+        element state shared by all sessions created by the app
+    :param goblin.cache.QueryCache query_cache: Optional cache of the
+        results of read-only traversals shared by all sessions created by
+        the app
     """
 
     def __init__(self,
@@ -29,7 +34,9 @@ class Goblin:
                  *,
                  provider=provider.TinkerGraph,
                  get_hashable_id=None,
-                 aliases=None):
+                 aliases=None,
+                 element_cache=None,
+                 query_cache=None):
         self._cluster = cluster
         self._loop = self._cluster._loop
         self._cluster = cluster
@@ -43,6 +50,8 @@ class Goblin:
         if aliases is None:
             aliases = {}
         self._aliases = aliases
+        self._element_cache = element_cache
+        self._query_cache = query_cache
 
     @classmethod
     async def open(cls,
@@ -51,6 +60,8 @@ class Goblin:
                    provider=provider.TinkerGraph,
                    get_hashable_id=None,
                    aliases=None,
+                   element_cache=None,
+                   query_cache=None,
                    **config):
         # App currently only supports GraphSON 1
         # aiogremlin does not yet support providers
@@ -60,7 +71,9 @@ class Goblin:
             cluster,
             provider=provider,
             get_hashable_id=get_hashable_id,
-            aliases=aliases)
+            aliases=aliases,
+            element_cache=element_cache,
+            query_cache=query_cache)
         return app
 
     @property
@@ -71,6 +84,20 @@ class Goblin:
     def config(self):
         return self.cluster.config
 
+    @property
+    def provider(self):
+        return self._provider
+
+    @property
+    def element_cache(self):
+        """Element state cache shared by sessions, or `None`"""
+        return self._element_cache
+
+    @property
+    def query_cache(self):
+        """Traversal result cache shared by sessions, or `None`"""
+        return self._query_cache
+
     @property
     def vertices(self):
         """Registered vertex classes"""
@@ -137,15 +164,33 @@ class Goblin:
                 elements.append(item)
         self.register(*elements)
 
-    async def session(self, *, processor='', op='eval', aliases=None):
+    async def session(self, *, processor='', op='eval', aliases=None,
+                      **options):
         """
         Create a session object.
 
+        :param str processor: Gremlin Server processor. Pass ``'session'``
+            to run the traversals of the session in a server session, see
+            :py:class:`SessionRemoteConnection
+            <goblin.driver.remote_connection.SessionRemoteConnection>`.
+            Flushes then commit once if the provider supports transactions
+        :param options: Keyword options passed to
+            :py:class:`Session<goblin.session.Session>`, e.g. ``hydration``
+
         :returns: :py:class:`Session<goblin.session.Session>` object
         """
-        remote_connection = await aiogremlin.DriverRemoteConnection.using(
-            self._cluster, aliases=self._aliases)
-        return session.Session(self, remote_connection, self._get_hashable_id)
+        if processor == 'session':
+            remote_connection = await driver.SessionRemoteConnection.using(
+                self._cluster, aliases=self._aliases,
+                op_args=self._provider.get_default_op_args(processor))
+        elif not processor:
+            remote_connection = await aiogremlin.DriverRemoteConnection.using(
+                self._cluster, aliases=self._aliases)
+        else:
+            raise exception.ConfigurationError(
+                'Unsupported processor: {}'.format(processor))
+        return session.Session(self, remote_connection, self._get_hashable_id,
+                               **options)
 
     async def close(self):
         await self._cluster.close()
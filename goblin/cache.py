@@ -0,0 +1,287 @@
+"""Identity map and caches used to avoid reloading graph elements"""
+
+import collections
+import collections.abc
+import copy
+import logging
+import time
+import weakref
+
+logger = logging.getLogger(__name__)
+
+
+class IdentityMap(collections.abc.MutableMapping):
+    """
+    Maps hashable element ids to the OGM elements loaded by a
+    :py:class:`Session<goblin.session.Session>`, so the same id always
+    resolves to the same object. By default every element is kept until the
+    session is closed.
+
+    :param int maxsize: Maximum number of elements strongly referenced by the
+        map. Least recently used elements are evicted beyond this size.
+        Unbounded by default
+    :param bool weak: Keep weak references to elements, so elements that
+        are still referenced elsewhere keep their identity after they have
+        been evicted. If no `maxsize` is passed, the map only holds weak
+        references
+    :param pinned: Callable that receives an element and returns `True` if it
+        must not be evicted, e.g. because it has pending changes
+    """
+
+    def __init__(self, *, maxsize=None, weak=False, pinned=None):
+        if weak and maxsize is None:
+            maxsize = 0
+        self._maxsize = maxsize
+        self._pinned = pinned
+        self._strong = collections.OrderedDict()
+        self._weak = None
+        if weak:
+            self._weak = weakref.WeakValueDictionary()
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    def __getitem__(self, key):
+        try:
+            element = self._strong[key]
+        except KeyError:
+            if self._weak is None:
+                raise
+            element = self._weak[key]
+            self._strong[key] = element
+            self._evict()
+        else:
+            if self._maxsize is not None:
+                self._strong.move_to_end(key)
+        return element
+
+    def __setitem__(self, key, element):
+        self._strong[key] = element
+        if self._maxsize is not None:
+            self._strong.move_to_end(key)
+        if self._weak is not None:
+            self._weak[key] = element
+        self._evict()
+
+    def __delitem__(self, key):
+        found = self._strong.pop(key, None) is not None
+        if self._weak is not None:
+            found = self._weak.pop(key, None) is not None or found
+        if not found:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in self._strong:
+            return True
+        return self._weak is not None and key in self._weak
+
+    def __iter__(self):
+        if self._weak is not None:
+            return iter(list(self._weak.keys()))
+        return iter(self._strong)
+
+    def __len__(self):
+        if self._weak is not None:
+            return len(self._weak)
+        return len(self._strong)
+
+    def clear(self):
+        self._strong.clear()
+        if self._weak is not None:
+            self._weak.clear()
+
+    def _evict(self):
+        if self._maxsize is None:
+            return
+        pinned = []
+        while self._strong and (
+                len(self._strong) + len(pinned) > self._maxsize):
+            key, element = self._strong.popitem(last=False)
+            if self._pinned is not None and self._pinned(element):
+                pinned.append((key, element))
+        for key, element in pinned:
+            self._strong[key] = element
+
+    def __repr__(self):
+        return '<{}(size={}, maxsize={}, weak={})>'.format(
+            self.__class__.__name__, len(self), self._maxsize,
+            self._weak is not None)
+
+
+class ElementCache:
+    """
+    Cache of hydrated element state shared by all sessions created by a
+    :py:class:`Goblin<goblin.app.Goblin>` app. Stores the label and
+    properties fetched for an element by its hashable id, so sessions can
+    hydrate the element without querying the database.
+
+    :param int maxsize: Maximum number of cached elements, least recently
+        used entries are evicted first
+    :param float ttl: Time in seconds an entry stays valid. Entries never
+        expire by default
+    :param timer: Clock used to expire entries
+    """
+
+    def __init__(self, *, maxsize=1024, ttl=None, timer=time.monotonic):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._timer = timer
+        self._entries = collections.OrderedDict()
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @property
+    def ttl(self):
+        return self._ttl
+
+    def get(self, key):
+        """
+        Get a copy of the cached state for an element.
+
+        :returns: `dict` of properties or `None`
+        """
+        entry = self._entries.get(key, None)
+        if entry is None:
+            return None
+        expires, state = entry
+        if expires is not None and expires <= self._timer():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(state)
+
+    def put(self, key, state):
+        """Store a copy of the state fetched for an element"""
+        expires = None
+        if self._ttl is not None:
+            expires = self._timer() + self._ttl
+        self._entries[key] = (expires, copy.deepcopy(state))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        """Drop the cached state of the elements with the given ids"""
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return '<{}(size={}, maxsize={}, ttl={})>'.format(
+            self.__class__.__name__, len(self), self._maxsize, self._ttl)
+
+
+class QueryCache:
+    """
+    Cache of the results of read-only traversals that return no elements,
+    keyed by normalized traversal bytecode (see
+    :py:func:`cache_key<goblin.query.cache_key>`). Entries are indexed by
+    the labels their traversal touches, so writes only invalidate the
+    results that may have changed.
+
+    :param int maxsize: Maximum number of cached traversals, least recently
+        used entries are evicted first
+    :param float ttl: Time in seconds an entry stays valid. Entries never
+        expire by default
+    :param timer: Clock used to expire entries
+    """
+
+    def __init__(self, *, maxsize=1024, ttl=None, timer=time.monotonic):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._timer = timer
+        self._entries = collections.OrderedDict()
+        self._labels = collections.defaultdict(set)
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @property
+    def ttl(self):
+        return self._ttl
+
+    def get(self, key):
+        """
+        Get a copy of the cached results of a traversal.
+
+        :returns: `list` of results or `None`
+        """
+        entry = self._entries.get(key, None)
+        if entry is None:
+            return None
+        expires, _, results = entry
+        if expires is not None and expires <= self._timer():
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(results)
+
+    def put(self, key, labels, results):
+        """
+        Store a copy of the results of a traversal.
+
+        :param key: Normalized traversal
+        :param frozenset labels: Labels touched by the traversal, `None` if
+            it may touch any label
+        :param list results: Results of the traversal
+        """
+        self._discard(key)
+        expires = None
+        if self._ttl is not None:
+            expires = self._timer() + self._ttl
+        self._entries[key] = (expires, labels, copy.deepcopy(results))
+        for label in labels or (None,):
+            self._labels[label].add(key)
+        while len(self._entries) > self._maxsize:
+            self._discard(next(iter(self._entries)))
+
+    def invalidate(self, *labels):
+        """
+        Drop the results of traversals that touch any of the given labels,
+        as well as those of traversals that may touch any label. Drops all
+        results if no label is passed.
+        """
+        if not labels:
+            self.clear()
+            return
+        keys = set(self._labels.get(None, ()))
+        for label in labels:
+            keys.update(self._labels.get(label, ()))
+        for key in keys:
+            self._discard(key)
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for label in entry[1] or (None,):
+            keys = self._labels[label]
+            keys.discard(key)
+            if not keys:
+                del self._labels[label]
+
+    def clear(self):
+        self._entries.clear()
+        self._labels.clear()
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return '<{}(size={}, maxsize={}, ttl={})>'.format(
+            self.__class__.__name__, len(self), self._maxsize, self._ttl)
@@ -5,4 +5,7 @@ from aiogremlin.driver.pool import ConnectionPool # type: ignore
 from aiogremlin.driver.server import GremlinServer # type: ignore
 from gremlin_python.driver.serializer import GraphSONMessageSerializer # type: ignore
 
+from goblin.driver.remote_connection import (
+    SessionRemoteConnection, TraverserResultSet)
+
 AsyncGraph = Graph
@@ -0,0 +1,162 @@
+"""Remote connection that runs traversals in a Gremlin Server session"""
+
+import uuid
+
+from aiogremlin.driver.resultset import ResultSet # type: ignore
+from aiogremlin.exception import GremlinServerError # type: ignore
+from gremlin_python.driver.remote_connection import RemoteTraversal # type: ignore
+from gremlin_python.driver.request import RequestMessage # type: ignore
+from gremlin_python.process.traversal import Traverser # type: ignore
+
+from goblin import query
+
+
+class TraverserResultSet(ResultSet):
+    """
+    Result set of a script evaluated by the session processor. Wraps each
+    result in a traverser, like the results of a bytecode request.
+
+    :param aiogremlin.driver.resultset.ResultSet result_set: Raw results
+    """
+
+    def __init__(self, result_set):
+        super().__init__(result_set.request_id, result_set._timeout,
+                         result_set._loop)
+        self._response_queue = result_set.stream
+        self._done = result_set.done
+
+    async def one(self):
+        # Read raw messages, so falsy results don't end the iteration
+        msg = await ResultSet.one.__wrapped__(self)
+        if msg is None:
+            return None
+        if msg.status_code not in [200, 206]:
+            self.close()
+            raise GremlinServerError(
+                msg.status_code,
+                "{0}: {1}".format(msg.status_code, msg.message))
+        return Traverser(msg.data, 1)
+
+
+class SessionRemoteConnection:
+    """
+    Remote connection to a Gremlin Server that submits traversals to the
+    ``session`` processor, so they share server side state and
+    transactions. Traversals are translated to scripts, see
+    :py:func:`to_script<goblin.query.to_script>`. Do not instantiate
+    directly, instead use :py:meth:`SessionRemoteConnection.using`.
+
+    By default the server commits after each request. Requests submitted
+    between :py:meth:`begin` and :py:meth:`commit` or :py:meth:`rollback`
+    run in a single server transaction. Ending a transaction that submitted
+    no requests does not contact the server.
+
+    :param aiogremlin.driver.client.Client client: Client bound to the host
+        holding the session
+    :param str session: Session id
+    :param dict op_args: Default arguments added to each request
+    """
+
+    def __init__(self, client, session, *, op_args=None):
+        self._client = client
+        self._session = session
+        self._op_args = dict(op_args or {})
+        self._in_transaction = False
+        self._transaction_requests = 0
+
+    @property
+    def client(self):
+        return self._client
+
+    @property
+    def session(self):
+        """Session id sent with every request"""
+        return self._session
+
+    @property
+    def in_transaction(self):
+        return self._in_transaction
+
+    @classmethod
+    async def using(cls, cluster, aliases=None, *, hostname=None,
+                    op_args=None):
+        """
+        Create a :py:class:`SessionRemoteConnection` using a specific
+        :py:class:`Cluster<aiogremlin.driver.cluster.Cluster>`
+
+        :param aiogremlin.driver.cluster.Cluster cluster:
+        :param dict aliases: Optional mapping for aliases. Default is `None`
+        :param str hostname: Host holding the session. Default is the first
+            configured host
+        :param dict op_args: Default arguments added to each request, e.g.
+            provider specific session arguments
+        """
+        if hostname is None:
+            hostname = cluster.config['hosts'][0]
+        client = await cluster.connect(hostname=hostname, aliases=aliases)
+        return cls(client, str(uuid.uuid4()), op_args=op_args)
+
+    async def submit(self, bytecode):
+        """
+        Submit a traversal to the session.
+
+        :returns:
+            `gremlin_python.driver.remove_connection.RemoteTraversal`
+            object
+        """
+        script, bindings = query.to_script(bytecode)
+        result_set = await self.eval(script, bindings)
+        return RemoteTraversal(TraverserResultSet(result_set), None)
+
+    async def eval(self, script, bindings=None):
+        """
+        Evaluate a script in the session.
+
+        :returns: :py:class:`ResultSet<aiogremlin.driver.resultset.ResultSet>`
+            object
+        """
+        args = dict(self._op_args)
+        args.update({
+            'gremlin': script,
+            'bindings': bindings or {},
+            'session': self._session,
+            'manageTransaction': not self._in_transaction,
+            'aliases': self._client.aliases})
+        if self._in_transaction:
+            self._transaction_requests += 1
+        return await self._client.submit(
+            RequestMessage(processor='session', op='eval', args=args))
+
+    def begin(self):
+        """Run the following requests in a single server transaction"""
+        self._in_transaction = True
+
+    async def commit(self):
+        """Commit the transaction started by :py:meth:`begin`"""
+        try:
+            await self._end('g.tx().commit()')
+        finally:
+            self._in_transaction = False
+            self._transaction_requests = 0
+
+    async def rollback(self):
+        """Roll back the transaction started by :py:meth:`begin`"""
+        try:
+            await self._end('g.tx().rollback()')
+        finally:
+            self._in_transaction = False
+            self._transaction_requests = 0
+
+    async def _end(self, script):
+        if not self._transaction_requests:
+            return
+        result_set = await self.eval(script)
+        await result_set.all()
+
+    async def close(self):
+        """Close the session on the server, rolling back open transactions"""
+        args = dict(self._op_args)
+        args.update({'session': self._session})
+        result_set = await self._client.submit(
+            RequestMessage(processor='session', op='close', args=args))
+        await result_set.all()
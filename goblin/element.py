@@ -18,13 +18,40 @@ class ImmutableMode(Enum):
 class LockingMode(Enum):
     OFF = 0
     OPTIMISTIC_LOCKING = 1
+    VERSION_COUNTER = 2
+
+# Internal attributes set on element instances
+ELEMENT_SLOTS = ('_id', '_element_label', '_unloaded', '_loader', '_changes',
+                 '_snapshot')
+
+EDGE_SLOTS = ('_source', '_target')
+
+
+class LabelDescriptor:
+    """
+    Label of a compact element class. Instances store the label they were
+    loaded with in a slot. Not instantiated by user.
+    """
+
+    def __init__(self, label):
+        self._label = label
+
+    def __get__(self, obj, objtype):
+        if obj is None:
+            return self._label
+        return getattr(obj, '_element_label', self._label)
+
+    def __set__(self, obj, label):
+        obj._element_label = label
+
 
 class ElementMeta(ABCMeta):
     """
     Metaclass for graph elements. Responsible for creating the
     :py:class:`Mapping<goblin.mapper.Mapping>` object and replacing user
     defined :py:class:`goblin.properties.Property` with
-    :py:class:`goblin.properties.PropertyDescriptor`.
+    :py:class:`goblin.properties.PropertyDescriptor`. Generates ``__slots__``
+    for vertex and edge classes that set ``__compact__ = True``.
     """
 
     def __new__(cls, name, bases, namespace, **kwds):
@@ -43,6 +70,14 @@ class ElementMeta(ABCMeta):
         namespace['__type__'] = element_type
         if not namespace.get('__label__', None):
             namespace['__label__'] = inflection.underscore(name)
+        locking = namespace.get('__locking__', LockingMode.OFF)
+        if (locking == LockingMode.VERSION_COUNTER and
+                'version' not in props and 'version' not in namespace):
+            # Compared and incremented by every update of the element
+            namespace['version'] = properties.Property(properties.Integer)
+        compact = namespace.get('__compact__', any(
+            getattr(base, '__compact__', False) for base in bases))
+        namespace['__compact__'] = compact
         new_namespace = {}
         props.pop('id', None)
         for k, v in namespace.items():
@@ -60,13 +95,48 @@ class ElementMeta(ABCMeta):
         new_namespace['__mapping__'] = mapper.create_mapping(namespace, props)
         new_namespace['__properties__'] = props
         new_namespace['__immutable__'] = namespace.get('__immutable__', ImmutableMode.OFF)
-        new_namespace['__locking__'] = namespace.get('__locking__', LockingMode.OFF)
+        new_namespace['__locking__'] = locking
+        if compact and element_type in ('vertex', 'edge'):
+            new_namespace['__slots__'] = cls._compact_slots(
+                element_type, props, bases)
+            new_namespace['__label__'] = LabelDescriptor(
+                namespace['__label__'])
         result = ABCMeta.__new__(cls, name, bases, new_namespace)
         return result
 
+    @staticmethod
+    def _compact_slots(element_type, props, bases):
+        """Instance attributes of a compact class not slotted by its bases"""
+        names = list(ELEMENT_SLOTS)
+        if element_type == 'edge':
+            names.extend(EDGE_SLOTS)
+        names.extend('_' + name for name in props)
+        inherited = set()
+        for base in bases:
+            for klass in base.__mro__:
+                slots = klass.__dict__.get('__slots__', ())
+                if isinstance(slots, str):
+                    slots = (slots,)
+                inherited.update(slots)
+        if not any(base.__weakrefoffset__ for base in bases):
+            names.insert(0, '__weakref__')
+        return tuple(name for name in dict.fromkeys(names)
+                     if name not in inherited)
+
 
 class Element(metaclass=ElementMeta):
-    """Base class for classes that implement the Element property interface"""
+    """
+    Base class for classes that implement the Element property interface.
+
+    Set ``__compact__ = True`` on a vertex or edge class to store its
+    instances in ``__slots__`` instead of a ``__dict__``, which greatly
+    reduces their memory footprint. Subclasses of compact classes are
+    compact too. Compact elements only load the properties their class
+    declares.
+    """
+
+    __slots__ = ()
+    __compact__ = False
 
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
@@ -87,6 +157,9 @@ class VertexPropertyDescriptor:
     as instance attributes.
     """
 
+    # Values loaded from the db are stored in the backing attribute directly
+    __trusted__ = True
+
     def __init__(self, name, vertex_property):
         self._prop_name = name
         self._name = '_' + name
@@ -98,6 +171,7 @@ class VertexPropertyDescriptor:
     def __get__(self, obj, objtype):
         if obj is None:
             return getattr(objtype.__mapping__, self._prop_name)
+        properties.ensure_loaded(obj, self._prop_name)
         default = self._default
         if default is not None:
 
@@ -110,6 +184,8 @@ class VertexPropertyDescriptor:
         if val is not None:
             val = self._data_type.validate_vertex_prop(
                 val, self._cardinality, self._vertex_property, self._data_type)
+        properties.mark_loaded(obj, self._prop_name)
+        properties.mark_changed(obj, self._prop_name)
         setattr(obj, self._name, val)
 
 
@@ -197,6 +273,8 @@ class VertexProperty(Element, abc.BaseProperty):
 class Vertex(Element):
     """Base class for user defined Vertex classes"""
 
+    __slots__ = ()
+
     def to_dict(self):
         result = {'__label__': self.__label__, '__type__': self.__type__}
         for key, value in self.__properties__.items():
@@ -256,6 +334,8 @@ class Edge(Element):
     :param Vertex target: Target (inV) vertex
     """
 
+    __slots__ = ()
+
     def __init__(self, source=None, target=None):
         self.source = source
         self.target = target
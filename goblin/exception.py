@@ -18,6 +18,14 @@ class ElementError(Exception):
     pass
 
 
+class LazyLoadError(ElementError):
+    pass
+
+
+class ConflictError(ElementError):
+    pass
+
+
 class ConfigurationError(Exception):
     pass
 
@@ -2,13 +2,17 @@
 
 from typing import Any, Dict
 import functools
+import keyword
 import logging
+import types
 
 from goblin import exception
 from gremlin_python.process.traversal import T
 
 logger = logging.getLogger(__name__)
 
+_NO_SNAPSHOT = types.MappingProxyType({})
+
 
 def map_props_to_db(element, mapping):
     """Convert OGM property names/values to DB property names/values"""
@@ -16,24 +20,83 @@ def map_props_to_db(element, mapping):
     props = mapping.ogm_properties
     for ogm_name, (db_name, data_type) in props.items():
         val = getattr(element, ogm_name, None)
-        if val and isinstance(val, (list, set)):
-            card = None
-            for v in val:
-                metaprops = get_metaprops(v, v.__mapping__)
-                property_tuples.append((card, db_name, data_type.to_db(
-                    v.value), metaprops))
-                card = v.cardinality
+        property_tuples.extend(map_value_to_db(val, db_name, data_type))
+    return property_tuples
+
+
+def map_value_to_db(val, db_name, data_type):
+    """Convert the value of one OGM property to DB property tuples"""
+    property_tuples = []
+    if val and isinstance(val, (list, set)):
+        card = None
+        for v in val:
+            metaprops = get_metaprops(v, v.__mapping__)
+            property_tuples.append((card, db_name, data_type.to_db(
+                v.value), metaprops))
+            card = v.cardinality
+    else:
+        if hasattr(val, '__mapping__'):
+            metaprops = get_metaprops(val, val.__mapping__)
+            val = val.value
         else:
-            if hasattr(val, '__mapping__'):
-                metaprops = get_metaprops(val, val.__mapping__)
-                val = val.value
-            else:
-                metaprops = None
-            property_tuples.append((None, db_name, data_type.to_db(val),
-                                    metaprops))
+            metaprops = None
+        property_tuples.append((None, db_name, data_type.to_db(val),
+                                metaprops))
     return property_tuples
 
 
+def track_changes(element, changes=()):
+    """
+    Start tracking the changes made to an element loaded from, or saved to,
+    the db. Property assignments are recorded by the property descriptors.
+    Vertex properties and collections can also be changed in place, so their
+    DB values are kept to be compared on save.
+
+    :param set changes: OGM names of properties that are still changed
+    """
+    snapshot = None
+    for ogm_name, (db_name, data_type) in \
+            element.__mapping__.ogm_properties.items():
+        # Read stored values directly, so unloaded lazy properties and
+        # defaults are left alone
+        val = getattr(element, '_' + ogm_name, None)
+        if hasattr(val, '__mapping__') or isinstance(val, (list, set)):
+            if snapshot is None:
+                snapshot = {}
+            snapshot[ogm_name] = map_value_to_db(val, db_name, data_type)
+    # Immutable and shared while empty, to keep tracked elements small
+    element._changes = frozenset(changes)
+    element._snapshot = snapshot or _NO_SNAPSHOT
+
+
+def map_changes_to_db(element, mapping):
+    """
+    Convert the OGM properties changed since the element was loaded or last
+    saved to DB property names/values.
+
+    :returns: tuple of (property tuples, DB names of the changed properties),
+        or `None` if the element's changes are not tracked
+    """
+    changes = getattr(element, '_changes', None)
+    if changes is None:
+        return None
+    snapshot = element._snapshot
+    property_tuples = []
+    db_names = []
+    for ogm_name, (db_name, data_type) in mapping.ogm_properties.items():
+        if ogm_name in snapshot and ogm_name not in changes:
+            val = getattr(element, '_' + ogm_name, None)
+            if map_value_to_db(val, db_name, data_type) == \
+                    snapshot[ogm_name]:
+                continue
+        elif ogm_name not in changes:
+            continue
+        val = getattr(element, ogm_name, None)
+        property_tuples.extend(map_value_to_db(val, db_name, data_type))
+        db_names.append(db_name)
+    return property_tuples, db_names
+
+
 def get_metaprops(vertex_property, mapping):
     props = mapping.ogm_properties
     metaprops = {}
@@ -49,46 +112,57 @@ def map_vertex_to_ogm(result, props, element, *, mapping=None):
     label = props.pop('label')
     for db_name, value in props.items():
         metaprops = []
-        if len(value) > 1:
-            values = []
-            for v in value:
-                if isinstance(v, dict):
-                    val = v.pop('value')
-                    v.pop('key')
-                    vid = v.pop('id')
-                    if v:
-                        v['id'] = vid
-                        metaprops.append((val, v))
-                    values.append(val)
-                else:
-                    values.append(v)
-            value = values
-        else:
-            value = value[0]
-            if isinstance(value, dict):
-                val = value.pop('value')
-                value.pop('key')
-                vid = value.pop('id')
-                if value:
-                    value['id'] = vid
-                    metaprops.append((val, value))
-                value = val
+        value = _vertex_value(value, metaprops)
         name, data_type = mapping.db_properties.get(db_name, (db_name, None))
         if data_type:
             value = data_type.to_ogm(value)
         setattr(element, name, value)
         if metaprops:
-            vert_prop = getattr(element, name)
-            if hasattr(vert_prop, 'mapper_func'):
-                # Temporary hack for managers
-                vert_prop.mapper_func(metaprops, vert_prop)
-            else:
-                vert_prop.__mapping__.mapper_func(metaprops, vert_prop)
+            _map_metaprops(getattr(element, name), metaprops)
     setattr(element, '__label__', label)
     setattr(element, 'id', result.id)
     return element
 
 
+def _vertex_value(value, metaprops):
+    """
+    Unpack the values of a vertex property returned by DB, appending
+    `(value, metaprops)` pairs to `metaprops`
+    """
+    if len(value) > 1:
+        values = []
+        for v in value:
+            if isinstance(v, dict):
+                val = v.pop('value')
+                v.pop('key')
+                vid = v.pop('id')
+                if v:
+                    v['id'] = vid
+                    metaprops.append((val, v))
+                values.append(val)
+            else:
+                values.append(v)
+        return values
+    value = value[0]
+    if isinstance(value, dict):
+        val = value.pop('value')
+        value.pop('key')
+        vid = value.pop('id')
+        if value:
+            value['id'] = vid
+            metaprops.append((val, value))
+        value = val
+    return value
+
+
+def _map_metaprops(vert_prop, metaprops):
+    if hasattr(vert_prop, 'mapper_func'):
+        # Temporary hack for managers
+        vert_prop.mapper_func(metaprops, vert_prop)
+    else:
+        vert_prop.__mapping__.mapper_func(metaprops, vert_prop)
+
+
 # TODO: temp hack
 def get_hashable_id(val: Dict[str, Any]) -> Any:
     if isinstance(val, dict) and "@type" in val and "@value" in val:
@@ -136,6 +210,11 @@ def map_edge_to_ogm(result, props, element, *, mapping=None):
         setattr(element, name, value)
     setattr(element, '__label__', label)
     setattr(element, 'id', result.id)
+    _map_edge_vertices(result, element)
+    return element
+
+
+def _map_edge_vertices(result, element):
     # Currently not included in graphson
     # setattr(element.source, '__label__', result.outV.label)
     # setattr(element.target, '__label__', result.inV.label)
@@ -151,7 +230,6 @@ def map_edge_to_ogm(result, props, element, *, mapping=None):
         element.target = GenericVertex()
     setattr(element.source, 'id', sid)
     setattr(element.target, 'id', tid)
-    return element
 
 
 def _check_id(rid, eid):
@@ -161,6 +239,171 @@ def _check_id(rid, eid):
     return False
 
 
+# Generated mapper functions
+_missing = object()
+
+# Types stored as is by map_value_to_db
+_SCALAR_TYPES = frozenset([bool, bytes, float, int, str])
+
+
+def _attribute(name):
+    """Expression reading attribute `name` of ``element``"""
+    if name.isidentifier() and not keyword.iskeyword(name):
+        return 'element.{}'.format(name)
+    return 'getattr(element, {!r})'.format(name)
+
+
+def _compile(func_name, lines, namespace, mapping):
+    source = '\n'.join(lines)
+    code = compile(source, '<{} {}>'.format(func_name, mapping.label), 'exec')
+    exec(code, namespace)
+    func = namespace[func_name]
+    func.__source__ = source
+    return func
+
+
+def _load(mapping, name, i, namespace):
+    """
+    Statement storing ``value`` in attribute `name` of ``element``. Values
+    of properties whose descriptor class itself sets ``__trusted__`` are
+    stored directly in the backing attribute: they were typed by the db, so
+    they are not validated and vertex properties are built with
+    :py:meth:`load_vertex_prop<goblin.abc.DataType.load_vertex_prop>`.
+
+    :returns: tuple of the statement and an expression reading the stored
+        value back
+    """
+    prop = mapping._properties.get(name)
+    descriptor = getattr(prop, '__descriptor__', None)
+    # Trust is not inherited, subclasses may validate in __set__
+    if not vars(descriptor or object).get('__trusted__', False):
+        attribute = _attribute(name)
+        if attribute.startswith('element.'):
+            return '{} = value'.format(attribute), attribute
+        return 'setattr(element, {!r}, value)'.format(name), attribute
+    attribute = _attribute('_' + name)
+    value = 'value'
+    if hasattr(prop, '__mapping__'):
+        loader = '_load_vertex_prop_{}'.format(i)
+        namespace[loader] = functools.partial(
+            prop.data_type.load_vertex_prop, card=prop.cardinality,
+            vertex_prop=prop.__class__, data_type=prop.data_type)
+        value = '{}(value) if value is not None else None'.format(loader)
+    if attribute.startswith('element.'):
+        return '{} = {}'.format(attribute, value), attribute
+    return 'setattr(element, {!r}, {})'.format('_' + name, value), attribute
+
+
+def compile_vertex_mapper(mapping):
+    """
+    Generate the equivalent of :py:func:`map_vertex_to_ogm` for a mapping,
+    with the db names, attributes and converters of its properties inlined.
+    Loaded values are trusted, see :py:func:`_load`. Compact elements ignore
+    db properties missing from the mapping.
+    """
+    namespace = {'_missing': _missing, '_vertex_value': _vertex_value,
+                 '_map_metaprops': _map_metaprops}
+    lines = ['def map_vertex_to_ogm(result, props, element):',
+             "    props.pop('id')",
+             "    label = props.pop('label')",
+             "    unloaded = getattr(element, '_unloaded', None)"]
+    for i, (db_name, (name, data_type)) in enumerate(
+            mapping.db_properties.items()):
+        namespace['_to_ogm_{}'.format(i)] = data_type.to_ogm
+        store, attribute = _load(mapping, name, i, namespace)
+        lines.extend([
+            '    value = props.pop({!r}, _missing)'.format(db_name),
+            '    if value is not _missing:',
+            '        metaprops = []',
+            '        value = _to_ogm_{}(_vertex_value(value, metaprops))'
+            .format(i),
+            '        ' + store,
+            '        if unloaded:',
+            '            unloaded.discard({!r})'.format(name),
+            '        if metaprops:',
+            '            _map_metaprops({}, metaprops)'.format(attribute)])
+    if not mapping.compact:
+        lines.extend([
+            '    for db_name, value in props.items():',
+            '        metaprops = []',
+            '        setattr(element, db_name, _vertex_value(value, metaprops))',
+            '        if metaprops:',
+            '            _map_metaprops(getattr(element, db_name), metaprops)'])
+    lines.extend([
+        '    element.__label__ = label',
+        '    element.id = result.id',
+        '    return element'])
+    return _compile('map_vertex_to_ogm', lines, namespace, mapping)
+
+
+def compile_edge_mapper(mapping):
+    """
+    Generate the equivalent of :py:func:`map_edge_to_ogm` for a mapping,
+    with the db names, attributes and converters of its properties inlined.
+    Loaded values are trusted, see :py:func:`_load`. Compact elements ignore
+    db properties missing from the mapping.
+    """
+    namespace = {'_missing': _missing, 'T': T,
+                 '_map_edge_vertices': _map_edge_vertices}
+    lines = ['def map_edge_to_ogm(result, props, element):',
+             '    props.pop(T.id)',
+             '    label = props.pop(T.label)',
+             "    unloaded = getattr(element, '_unloaded', None)"]
+    for i, (db_name, (name, data_type)) in enumerate(
+            mapping.db_properties.items()):
+        namespace['_to_ogm_{}'.format(i)] = data_type.to_ogm
+        store, _ = _load(mapping, name, i, namespace)
+        lines.extend([
+            '    value = props.pop({!r}, _missing)'.format(db_name),
+            '    if value is not _missing:',
+            '        value = _to_ogm_{}(value)'.format(i),
+            '        ' + store,
+            '        if unloaded:',
+            '            unloaded.discard({!r})'.format(name)])
+    if not mapping.compact:
+        lines.extend([
+            '    for db_name, value in props.items():',
+            '        setattr(element, db_name, value)'])
+    lines.extend([
+        '    element.__label__ = label',
+        '    element.id = result.id',
+        '    _map_edge_vertices(result, element)',
+        '    return element'])
+    return _compile('map_edge_to_ogm', lines, namespace, mapping)
+
+
+def compile_props_mapper(mapping):
+    """
+    Generate the equivalent of :py:func:`map_props_to_db` for a mapping.
+    Scalar values are converted inline, other values are passed to
+    :py:func:`map_value_to_db`.
+    """
+    namespace = {'_SCALAR_TYPES': _SCALAR_TYPES,
+                 'map_value_to_db': map_value_to_db}
+    lines = ['def map_props_to_db(element):',
+             '    property_tuples = []']
+    for i, (name, (db_name, data_type)) in enumerate(
+            mapping.ogm_properties.items()):
+        namespace['_data_type_{}'.format(i)] = data_type
+        namespace['_to_db_{}'.format(i)] = data_type.to_db
+        lines.extend([
+            '    val = {}'.format(_attribute(name)),
+            '    if val is None or val.__class__ in _SCALAR_TYPES:',
+            '        property_tuples.append('
+            '(None, {!r}, _to_db_{}(val), None))'.format(db_name, i),
+            '    else:',
+            '        property_tuples.extend('
+            'map_value_to_db(val, {!r}, _data_type_{}))'.format(db_name, i)])
+    lines.append('    return property_tuples')
+    return _compile('map_props_to_db', lines, namespace, mapping)
+
+
+_COMPILERS = {
+    map_vertex_to_ogm: compile_vertex_mapper,
+    map_edge_to_ogm: compile_edge_mapper,
+}
+
+
 # DB <-> OGM Mapping
 def create_mapping(namespace, properties):
     """Constructor for :py:class:`Mapping`"""
@@ -182,27 +425,45 @@ def create_mapping(namespace, properties):
 class Mapping:
     """
     This class stores the information necessary to map between an OGM element
-    and a DB element.
+    and a DB element. Vertex and edge mappings generate specialized mapper
+    functions for their properties when the element class is defined.
     """
 
     def __init__(self, namespace, element_type, mapper_func, properties):
         self._label = namespace['__label__']
         self._element_type = element_type
-        self._mapper_func = functools.partial(mapper_func, mapping=self)
+        self._compact = namespace.get('__compact__', False)
+        self._properties = properties
         self._db_properties = {}
         self._ogm_properties = {}
         self._map_properties(properties)
+        compiler = _COMPILERS.get(mapper_func)
+        if compiler:
+            self._mapper_func = compiler(self)
+        else:
+            self._mapper_func = functools.partial(mapper_func, mapping=self)
+        self._props_func = compile_props_mapper(self)
 
     @property
     def label(self):
         """Element label"""
         return self._label
 
+    @property
+    def compact(self):
+        """Whether instances only store the properties of the mapping"""
+        return self._compact
+
     @property
     def mapper_func(self):
         """Function responsible for mapping db results to ogm"""
         return self._mapper_func
 
+    @property
+    def props_func(self):
+        """Function responsible for mapping ogm properties to db"""
+        return self._props_func
+
     @property
     def db_properties(self):
         """A dictionary of property mappings"""
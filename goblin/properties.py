@@ -14,12 +14,46 @@ def noop_factory(x, y):
     return None
 
 
+def ensure_loaded(obj, name):
+    """
+    Load the properties of a lazily hydrated element the first time one of
+    them is accessed.
+
+    :param goblin.element.Element obj: The element being accessed
+    :param str name: The OGM name of the accessed property
+    """
+    unloaded = getattr(obj, '_unloaded', None)
+    if unloaded and name in unloaded:
+        loader = obj._loader()
+        if loader is None:
+            raise exception.LazyLoadError(
+                "Session that loaded element {} is gone".format(obj))
+        loader(obj)
+
+
+def mark_loaded(obj, name):
+    """Stop lazily loading a property once it has been assigned a value"""
+    unloaded = getattr(obj, '_unloaded', None)
+    if unloaded:
+        unloaded.discard(name)
+
+
+def mark_changed(obj, name):
+    """Record that a property of a tracked element was assigned"""
+    changes = getattr(obj, '_changes', None)
+    if changes is not None and name not in changes:
+        obj._changes = changes | {name}
+
+
 class PropertyDescriptor:
     """
     Descriptor that validates user property input and gets/sets properties
     as instance attributes. Not instantiated by user.
     """
 
+    # Values loaded from the db are stored in the backing attribute directly
+    __trusted__ = True
+
     def __init__(self, name, prop):
         self._prop_name = name
         self._name = '_' + name
@@ -29,10 +63,13 @@ class PropertyDescriptor:
     def __get__(self, obj, objtype):
         if obj is None:
             return getattr(objtype.__mapping__, self._prop_name)
+        ensure_loaded(obj, self._prop_name)
         return getattr(obj, self._name, self._default)
 
     def __set__(self, obj, val):
         val = self._data_type.validate(val)
+        mark_loaded(obj, self._prop_name)
+        mark_changed(obj, self._prop_name)
         setattr(obj, self._name, val)
 
     def __delete__(self, obj):
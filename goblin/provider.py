@@ -3,6 +3,8 @@ from typing import Dict, Any
 class Provider:
     """Superclass for provider plugins"""
     DEFAULT_OP_ARGS: Dict[Any, Any] = {}
+    # Sessions can run a flush in one server transaction
+    SUPPORTS_TRANSACTIONS = False
 
     @classmethod
     def get_default_op_args(cls, processor):
@@ -18,6 +20,7 @@ class TinkerGraph(Provider):  # TODO
 
 class JanusGraph(Provider):  # TODO
     """Default provider"""
+    SUPPORTS_TRANSACTIONS = True
 
     @staticmethod
     def get_hashable_id(val):
@@ -0,0 +1,404 @@
+"""Helper functions used to inspect and rewrite traversal bytecode"""
+
+import enum
+import logging
+
+from aiogremlin.process.graph_traversal import ( # type: ignore
+    AsyncGraphTraversal, AsyncGraphTraversalSource)
+from aiogremlin.remote.remote_connection import AsyncRemoteStrategy # type: ignore
+from gremlin_python.process.graph_traversal import __ # type: ignore
+from gremlin_python.process.traversal import ( # type: ignore
+    Binding, Bytecode, Cardinality, P, TextP)
+
+logger = logging.getLogger(__name__)
+
+
+VERTEX_STEPS = frozenset(
+    ['V', 'addV', 'out', 'in', 'both', 'outV', 'inV', 'bothV', 'otherV'])
+
+EDGE_STEPS = frozenset(['E', 'addE', 'outE', 'inE', 'bothE'])
+
+# Steps that neither change the type of the objects passing through them nor
+# (when they modulate a previous step) hide the step that does.
+PRESERVING_STEPS = frozenset([
+    'as', 'and', 'barrier', 'by', 'coin', 'cyclicPath', 'dedup', 'filter',
+    'from', 'has', 'hasId', 'hasKey', 'hasLabel', 'hasNot', 'hasValue',
+    'identity', 'is', 'limit', 'not', 'or', 'order', 'property', 'range',
+    'sample', 'sideEffect', 'simplePath', 'skip', 'tail', 'timeLimit', 'to',
+    'where', 'aggregate', 'store'])
+
+# Steps that modify the graph
+WRITE_STEPS = frozenset(['addE', 'addV', 'drop', 'property'])
+
+# Steps whose results differ between executions of the same traversal
+RANDOM_STEPS = frozenset(['coin', 'sample'])
+
+# Steps that filter by, or traverse, element labels given as arguments
+LABEL_STEPS = frozenset([
+    'addE', 'addV', 'both', 'bothE', 'hasLabel', 'in', 'inE', 'out', 'outE'])
+
+# Navigation steps that traverse edges of any label when called without
+# arguments
+NAVIGATION_STEPS = frozenset(['both', 'bothE', 'in', 'inE', 'out', 'outE'])
+
+# Steps that read every element of the graph
+START_STEPS = frozenset(['E', 'V'])
+
+# Steps whose nested traversals are alternatives, or negations, so label
+# filters in them do not restrict the elements that pass
+BRANCH_STEPS = frozenset([
+    'choose', 'coalesce', 'not', 'optional', 'or', 'union'])
+
+# Predicates that only match the labels they are given
+LABEL_PREDICATES = frozenset(['and', 'eq', 'or', 'within'])
+
+# Steps that reach vertices of unknown label, the arguments of the
+# navigation steps are edge labels
+UNLABELED_STEPS = frozenset([
+    'both', 'bothV', 'in', 'inV', 'otherV', 'out', 'outV'])
+
+
+def element_type(bytecode):
+    """
+    Find the type of element emitted by a traversal, if it can be determined
+    from its bytecode.
+
+    :param gremlin_python.process.traversal.Bytecode bytecode:
+
+    :returns: 'vertex', 'edge' or `None`
+    """
+    for step in reversed(bytecode.step_instructions):
+        name = step[0]
+        if name in VERTEX_STEPS:
+            return 'vertex'
+        if name in EDGE_STEPS:
+            return 'edge'
+        if name not in PRESERVING_STEPS:
+            return None
+    return None
+
+
+def vertex_projection(keys=()):
+    """
+    Anonymous traversal that projects a vertex together with its label,
+    properties and meta-properties.
+
+    :param tuple keys: Only project these db property names (optional)
+    """
+    return __.project('element', 'label', 'properties') \
+             .by(__.identity()).by(__.label()) \
+             .by(__.properties(*keys)
+                   .project('id', 'key', 'value', 'meta')
+                   .by(__.id()).by(__.key()).by(__.value())
+                   .by(__.valueMap()).fold())
+
+
+def edge_projection(keys=()):
+    """
+    Anonymous traversal that projects an edge together with its properties
+
+    :param tuple keys: Only project these db property names (optional)
+    """
+    return __.project('element', 'properties') \
+             .by(__.identity()).by(__.valueMap(True, *keys))
+
+
+def append_steps(bytecode, traversal):
+    """
+    Copy `bytecode` and append the steps of an anonymous traversal to the copy.
+
+    :returns: `gremlin_python.process.traversal.Bytecode`
+    """
+    result = Bytecode(bytecode)
+    result.bindings.update(bytecode.bindings)
+    result.step_instructions.extend(traversal.bytecode.step_instructions)
+    result.bindings.update(traversal.bytecode.bindings)
+    return result
+
+
+def project_elements(bytecode, element_type, keys=()):
+    """
+    Rewrite `bytecode` so each emitted element comes back with all the data
+    needed to map it to the OGM.
+    """
+    if element_type == 'vertex':
+        return append_steps(bytecode, vertex_projection(keys))
+    return append_steps(bytecode, edge_projection(keys))
+
+
+def _instructions(bytecode):
+    """Iterate over the instructions of `bytecode` and nested traversals"""
+    for instruction in bytecode.source_instructions:
+        yield instruction
+    for instruction in bytecode.step_instructions:
+        yield instruction
+        for arg in instruction[1:]:
+            if isinstance(arg, Bytecode):
+                yield from _instructions(arg)
+
+
+def is_write(bytecode):
+    """Check if a traversal modifies the graph"""
+    return any(instruction[0] in WRITE_STEPS
+               for instruction in _instructions(bytecode))
+
+
+def is_cacheable(bytecode):
+    """
+    Check if a traversal neither modifies the graph nor returns random
+    results, so its results can be cached.
+    """
+    return not any(instruction[0] in WRITE_STEPS or
+                   instruction[0] in RANDOM_STEPS
+                   for instruction in _instructions(bytecode))
+
+
+def labels(bytecode):
+    """
+    Find the element labels a traversal filters by or traverses.
+
+    :returns: `frozenset` of labels, or `None` if the traversal may touch
+        elements of any label
+    """
+    found = set()
+    if not _find_labels(bytecode, found):
+        return None
+    return frozenset(label for label in found if isinstance(label, str)) \
+        or None
+
+
+def _find_labels(bytecode, found, nested=False):
+    """
+    Add the labels of `bytecode` and its nested traversals to `found`.
+
+    :returns: `False` if the traversal reaches elements of unknown label
+    """
+    known = True
+    for i, instruction in enumerate(bytecode.step_instructions):
+        name, args = instruction[0], instruction[1:]
+        if name in START_STEPS:
+            # Only the start of a traversal may read all elements
+            if nested or i:
+                return False
+            known = False
+        elif name in NAVIGATION_STEPS and not args:
+            return False
+        if name == 'hasLabel' or (name == 'has' and len(args) == 3):
+            values = _labels(args if name == 'hasLabel' else args[:1])
+            if values is None:
+                return False
+            found.update(values)
+            known = True
+        elif name in LABEL_STEPS:
+            values = _labels(args)
+            if values is None:
+                return False
+            found.update(values)
+            known = name not in UNLABELED_STEPS
+        elif name in UNLABELED_STEPS:
+            known = False
+        for arg in args:
+            if not isinstance(arg, Bytecode):
+                continue
+            if name in BRANCH_STEPS and _filters_labels(arg):
+                # Other branches let elements of any label through
+                return False
+            if not _find_labels(arg, found, nested=True):
+                return False
+    return known
+
+
+def _filters_labels(bytecode):
+    return any(
+        instruction[0] == 'hasLabel' or
+        (instruction[0] == 'has' and len(instruction) == 4)
+        for instruction in _instructions(bytecode))
+
+
+def _labels(args):
+    """
+    Labels matched by label step arguments.
+
+    :returns: `list` of labels, or `None` if a predicate may match other
+        labels
+    """
+    labels = []
+    for arg in args:
+        if isinstance(arg, Binding):
+            arg = arg.value
+        if isinstance(arg, (P, TextP)):
+            if arg.operator not in LABEL_PREDICATES:
+                return None
+            values = _labels([arg.value, arg.other])
+            if values is None:
+                return None
+            labels.extend(values)
+        elif isinstance(arg, (list, set, tuple)):
+            values = _labels(arg)
+            if values is None:
+                return None
+            labels.extend(values)
+        elif arg is not None:
+            labels.append(arg)
+    return labels
+
+
+def cache_key(bytecode):
+    """
+    Normalize a traversal into a hashable key. Bindings are replaced by
+    their values, so traversals that only differ by binding names share a
+    key.
+
+    :returns: hashable key, or `None` if the traversal has arguments that
+        cannot be compared, e.g. lambdas
+    """
+    try:
+        return (_normalize(bytecode.source_instructions),
+                _normalize(bytecode.step_instructions))
+    except TypeError:
+        return None
+
+
+def _normalize(arg):
+    if isinstance(arg, Bytecode):
+        return ('bytecode', _normalize(arg.source_instructions),
+                _normalize(arg.step_instructions))
+    if isinstance(arg, Binding):
+        return _normalize(arg.value)
+    if isinstance(arg, (P, TextP)):
+        return (arg.__class__.__name__, arg.operator, _normalize(arg.value),
+                _normalize(arg.other))
+    if isinstance(arg, (list, tuple)):
+        return tuple(_normalize(item) for item in arg)
+    if isinstance(arg, set):
+        return frozenset(_normalize(item) for item in arg)
+    if isinstance(arg, dict):
+        return frozenset(
+            (_normalize(key), _normalize(val)) for key, val in arg.items())
+    if callable(arg):
+        raise TypeError('Lambdas cannot be normalized')
+    hash(arg)
+    return (arg.__class__, arg)
+
+
+def to_script(bytecode, source='g'):
+    """
+    Translate a traversal into a Gremlin-Groovy script, for processors that
+    only evaluate scripts. Arguments are sent as script bindings rather than
+    literals, so the server can reuse the compiled script.
+
+    :param gremlin_python.process.traversal.Bytecode bytecode:
+    :param str source: Name of the traversal source in the script
+
+    :returns: `tuple` of the script and a `dict` of bindings
+    """
+    bindings = {}
+    return _script(bytecode, source, bindings), bindings
+
+
+def _script(bytecode, source, bindings):
+    script = source
+    for instruction in bytecode.source_instructions:
+        script += _step(instruction, bindings)
+    for instruction in bytecode.step_instructions:
+        script += _step(instruction, bindings)
+    return script
+
+
+def _step(instruction, bindings):
+    args = ', '.join(_argument(arg, bindings) for arg in instruction[1:])
+    return '.{}({})'.format(instruction[0], args)
+
+
+def _argument(arg, bindings):
+    if isinstance(arg, Bytecode):
+        return _script(arg, '__', bindings)
+    if isinstance(arg, Binding):
+        bindings[arg.key] = arg.value
+        return arg.key
+    if isinstance(arg, P):
+        if arg.operator in ('and', 'or'):
+            return '{}.{}({})'.format(_argument(arg.value, bindings),
+                                      arg.operator,
+                                      _argument(arg.other, bindings))
+        args = [arg.value]
+        if arg.other is not None:
+            args.append(arg.other)
+        return '{}.{}({})'.format(
+            arg.__class__.__name__, arg.operator,
+            ', '.join(_argument(val, bindings) for val in args))
+    if isinstance(arg, enum.Enum):
+        name = arg.name.rstrip('_')
+        if isinstance(arg, Cardinality):
+            return 'VertexProperty.Cardinality.{}'.format(name)
+        return '{}.{}'.format(arg.__class__.__name__, name)
+    if arg is None:
+        return 'null'
+    if isinstance(arg, bool):
+        return 'true' if arg else 'false'
+    if callable(arg):
+        raise TypeError('Lambdas cannot be translated to scripts')
+    key = '_arg{}'.format(len(bindings))
+    while key in bindings:
+        key += '_'
+    bindings[key] = arg
+    return key
+
+
+class SessionTraversal(AsyncGraphTraversal):
+    """
+    Traversal generated by :py:meth:`Session.traversal
+    <goblin.session.Session.traversal>`. Adds OGM specific modifiers that
+    are applied by the session rather than sent to the server.
+    """
+
+    def __init__(self, graph, traversal_strategies, bytecode):
+        super().__init__(graph, traversal_strategies, bytecode)
+        self.element_class = None
+        self.only_properties = None
+
+    def only(self, *props):
+        """
+        Only fetch the given properties when hydrating the elements returned
+        by this traversal. Other properties are loaded lazily.
+
+        :param str props: Property names, e.g. ``Person.name``. OGM names are
+            mapped to db names if the traversal was created from an element
+            class.
+        """
+        ogm_properties = {}
+        if self.element_class:
+            ogm_properties = self.element_class.__mapping__.ogm_properties
+        names = set()
+        for prop in props:
+            if prop in ogm_properties:
+                prop, _ = ogm_properties[prop]
+            names.add(prop)
+        self.only_properties = frozenset(names)
+        return self
+
+
+class SessionRemoteStrategy(AsyncRemoteStrategy):
+    """Submits session traversals together with their OGM modifiers"""
+
+    async def apply(self, traversal):
+        if traversal.traversers is None:
+            remote_traversal = await self.remote_connection.submit(
+                traversal.bytecode, only=traversal.only_properties)
+            traversal.remote_results = remote_traversal
+            traversal.side_effects = remote_traversal.side_effects
+            traversal.traversers = remote_traversal.traversers
+
+
+class SessionTraversalSource(AsyncGraphTraversalSource):
+    """Traversal source that spawns :py:class:`SessionTraversal` objects"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.graph_traversal = SessionTraversal
+
+    def withRemote(self, remote_connection):
+        source = self.get_graph_traversal_source()
+        source.traversal_strategies.add_strategies(
+            [SessionRemoteStrategy(remote_connection)])
+        return source
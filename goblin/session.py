@@ -12,17 +12,52 @@ from aiogremlin.driver.protocol import Message # type: ignore
 from aiogremlin.driver.resultset import ResultSet # type: ignore
 from gremlin_python.process.graph_traversal import __, GraphTraversal # type: ignore
 from gremlin_python.driver.remote_connection import RemoteTraversal # type: ignore
-from gremlin_python.process.traversal import Binding, Cardinality, Traverser # type: ignore
-from gremlin_python.structure.graph import Edge, Vertex # type: ignore
+from gremlin_python.process.traversal import Binding, Cardinality, T, Traverser # type: ignore
+from gremlin_python.structure.graph import Edge, Path, Vertex # type: ignore
 
-from goblin import exception, mapper
-from goblin.element import GenericEdge, GenericVertex, VertexProperty, ImmutableMode, LockingMode
+from goblin import cache, driver, exception, mapper, query
+from goblin.element import Element, GenericEdge, GenericVertex, VertexProperty, ImmutableMode, LockingMode
 from goblin.manager import VertexPropertyManager
 import traceback
+from enum import Enum
 
 logger = logging.getLogger(__name__)
 
 
+class HydrationMode(Enum):
+    """
+    Strategy used by a :py:class:`Session` to map the vertices and edges
+    returned by a traversal to OGM elements.
+
+    ``LOOKUP`` fetches the label and properties of every element with
+    additional queries. ``PROJECTION`` rewrites traversals that emit elements
+    so the label and properties are returned in the same response. ``BATCH``
+    collects streamed elements into windows and hydrates each window with a
+    single query per element type. ``LAZY`` only sets the id and label of
+    elements, their properties are loaded on first access or by
+    :py:meth:`Session.materialize`.
+    """
+    LOOKUP = 0
+    PROJECTION = 1
+    BATCH = 2
+    LAZY = 3
+
+
+class FlushPolicy(Enum):
+    """
+    When :py:meth:`Session.submit` flushes pending elements before running a
+    traversal.
+
+    ``ALWAYS`` flushes before every traversal. ``NEVER`` leaves flushing to
+    the user. ``LABELS`` only flushes if the traversal filters by or
+    traverses the label of a pending element, or if its labels cannot be
+    determined from its bytecode.
+    """
+    ALWAYS = 0
+    NEVER = 1
+    LABELS = 2
+
+
 def bindprop(element_class, ogm_name, val, *, binding=None):
     """
     Helper function for binding ogm properties/values to corresponding db
@@ -43,6 +78,49 @@ def bindprop(element_class, ogm_name, val, *, binding=None):
     return db_name, val
 
 
+BulkLoadProgress = collections.namedtuple(
+    'BulkLoadProgress', ['elements', 'batches', 'elapsed', 'rate'])
+BulkLoadProgress.__doc__ = """
+Progress reported by :py:meth:`Session.bulk_load`: number of elements and
+batches written, elapsed seconds and elements written per second.
+"""
+
+
+class BoundedResultSet(ResultSet):
+    """
+    :py:class:`ResultSet<aiogremlin.driver.resultset.ResultSet>` that holds
+    at most `maxsize` results waiting to be consumed.
+    """
+
+    def __init__(self, request_id, timeout, loop, maxsize=0):
+        super().__init__(request_id, timeout, loop)
+        self._response_queue = asyncio.Queue(maxsize=maxsize)
+
+
+class ResultStream:
+    """
+    Producer side of a :py:class:`BoundedResultSet`. Holds the result queue
+    without keeping the result set itself alive, so the result set can be
+    garbage collected when its consumer drops it.
+
+    :param bool record: Keep the data of every queued result in
+        :py:attr:`results`
+    """
+
+    def __init__(self, result_set, record=False):
+        self._queue = result_set.stream
+        self._done = result_set.done
+        self.results = [] if record else None
+
+    async def put(self, result):
+        """Queue a result, waiting while the result queue is full"""
+        if result is None:
+            self._done.set()
+        elif self.results is not None:
+            self.results.append(result.data)
+        await self._queue.put(result)
+
+
 class Session:
     """
     Provides the main API for interacting with the database. Does not
@@ -51,17 +129,88 @@ class Session:
 
     :param goblin.app.Goblin app:
     :param aiogremlin.driver.connection.Connection conn:
+    :param HydrationMode hydration: How elements returned by traversals are
+        hydrated. Default is :py:attr:`HydrationMode.LOOKUP`
+    :param int batch_size: Maximum number of elements hydrated together when
+        using :py:attr:`HydrationMode.BATCH`
+    :param float batch_timeout: Maximum time in seconds a window waits for
+        more results before it is hydrated when using
+        :py:attr:`HydrationMode.BATCH`
+    :param int result_buffer_size: Maximum number of hydrated results
+        buffered for each traversal before the session stops reading the
+        server response. Unbounded by default
+    :param int identity_map_size: Maximum number of elements strongly held
+        by :py:attr:`current`, see
+        :py:class:`IdentityMap<goblin.cache.IdentityMap>`. Unbounded by
+        default
+    :param bool weak_identity_map: Hold weak references to the elements in
+        :py:attr:`current`
+    :param int flush_batch_size: If set, :py:meth:`flush` creates new
+        elements with chained traversals of up to this many elements, instead
+        of saving them one at a time. Created elements are not re-read from
+        the db
+    :param int flush_concurrency: Maximum number of elements :py:meth:`flush`
+        saves concurrently. Edges are saved after the pending vertices they
+        connect. Elements are saved one at a time by default
+    :param int autoflush_size: Flush in the background once this many
+        elements are pending
+    :param float autoflush_interval: Flush in the background this many
+        seconds after an element is added to an empty pending queue
+    :param autoflush_error: Callable receiving exceptions raised by
+        background flushes. By default they are raised by the next call to
+        :py:meth:`flush`
+    :param FlushPolicy flush_policy: When traversals flush pending elements.
+        Default is :py:attr:`FlushPolicy.ALWAYS`
+    :param bool write_only: Saves only return the id of the written element,
+        which is set on the saved element instead of re-reading its label
+        and properties from the db
+    :param bool upsert: Save existing elements with a single traversal that
+        updates the element, or creates it if it no longer exists. Requires
+        a provider that supports ``coalesce`` with mutating traversals.
+        Immutable elements and elements using optimistic locking are always
+        checked first
     """
 
-    def __init__(self, app, remote_connection, get_hashable_id):
+    def __init__(self, app, remote_connection, get_hashable_id, *,
+                 hydration=HydrationMode.LOOKUP, batch_size=100,
+                 batch_timeout=0.01, result_buffer_size=0,
+                 identity_map_size=None, weak_identity_map=False,
+                 flush_batch_size=None, flush_concurrency=1,
+                 autoflush_size=None, autoflush_interval=None,
+                 autoflush_error=None, flush_policy=FlushPolicy.ALWAYS,
+                 write_only=False, upsert=False):
         self._app = app
         self._remote_connection = remote_connection
         self._loop = self._app._loop
-        self._use_session = False
+        self._use_session = isinstance(
+            remote_connection, driver.SessionRemoteConnection)
+        self._transactions = (
+            self._use_session and app.provider.SUPPORTS_TRANSACTIONS)
         self._pending = collections.deque()
-        self._current = dict()
+        self._pending_counts = collections.Counter()
+        self._current = cache.IdentityMap(
+            maxsize=identity_map_size, weak=weak_identity_map,
+            pinned=self._is_pinned)
         self._get_hashable_id = get_hashable_id
         self._graph = aiogremlin.Graph()
+        self._hydration = hydration
+        self._batch_size = batch_size
+        self._batch_timeout = batch_timeout
+        self._result_buffer_size = result_buffer_size
+        self._element_cache = app.element_cache
+        self._query_cache = app.query_cache
+        self._flush_batch_size = flush_batch_size
+        self._flush_concurrency = flush_concurrency
+        self._flush_lock = asyncio.Lock()
+        self._autoflush_size = autoflush_size
+        self._autoflush_interval = autoflush_interval
+        self._autoflush_error = autoflush_error
+        self._autoflush_task = None
+        self._autoflush_timer = None
+        self._autoflush_exception = None
+        self._flush_policy = flush_policy
+        self._upsert = upsert
+        self._write_only = write_only
 
     @property
     def graph(self):
@@ -88,8 +237,31 @@ class Session:
     def close(self):
         """
         """
+        self._cancel_autoflush_timer()
+        if self._autoflush_task is not None:
+            self._autoflush_task.cancel()
+        if self._use_session and self._remote_connection is not None:
+            self._loop.create_task(self._close_session(
+                self._remote_connection))
         self._remote_connection = None
         self._app = None
+        self._current.clear()
+
+    async def _close_session(self, remote_connection):
+        try:
+            await remote_connection.close()
+        except Exception as e:
+            logger.warning('Failed to close server session %s: %s',
+                           remote_connection.session, e)
+
+    def _is_pinned(self, element):
+        """
+        Elements waiting to be flushed, with unsaved changes or with
+        properties still to be loaded lazily are never evicted from current
+        """
+        return (id(element) in self._pending_counts or
+                bool(getattr(element, '_changes', None)) or
+                bool(getattr(element, '_unloaded', None)))
 
     # Traversal API
     @property
@@ -120,9 +292,10 @@ class Session:
             class that will dictate the element type (vertex/edge) as well as
             the label for the traversal source
 
-        :returns: `aiogremlin.process.graph_traversal.AsyncGraphTraversal`
+        :returns: :py:class:`SessionTraversal<goblin.query.SessionTraversal>`
         """
-        traversal = self.graph.traversal().withRemote(self)
+        traversal = self.graph.traversal(
+            query.SessionTraversalSource).withRemote(self)
         if element_class:
             label = element_class.__mapping__.label
             if element_class.__type__ == 'vertex':
@@ -130,85 +303,498 @@ class Session:
             if element_class.__type__ == 'edge':
                 traversal = traversal.E()
             traversal = traversal.hasLabel(label)
+            traversal.element_class = element_class
         return traversal
 
-    async def submit(self, bytecode):
+    async def submit(self, bytecode, *, only=None):
         """
         Submit a query to the Gremiln Server.
 
         :param str gremlin: Gremlin script to submit to server.
         :param dict bindings: A mapping of bindings for Gremlin script.
+        :param frozenset only: Only fetch these db property names when
+            hydrating returned elements, other properties are loaded lazily
 
         :returns:
             `gremlin_python.driver.remove_connection.RemoteTraversal`
             object
         """
-        await self.flush()
+        if self._must_flush(bytecode):
+            await self.flush()
+        # Elements returned by a write are hydrated with their new state
+        write = query.is_write(bytecode)
+        cached = None
+        if self._query_cache is not None:
+            if write:
+                labels = query.labels(bytecode) or ()
+                self._query_cache.invalidate(*labels)
+            elif query.is_cacheable(bytecode):
+                key = query.cache_key(bytecode)
+                if key is not None:
+                    results = self._query_cache.get(key)
+                    if results is not None:
+                        return self._cached_traversal(results)
+                    cached = (key, query.labels(bytecode))
+        keys = tuple(only) if only else ()
+        projected = None
+        if self._hydration == HydrationMode.PROJECTION:
+            projected = query.element_type(bytecode)
+            if projected:
+                bytecode = query.project_elements(bytecode, projected, keys)
         remote_traversal = await self.remote_connection.submit(bytecode)
         traversers = remote_traversal.traversers
         side_effects = remote_traversal.side_effects
-        result_set = ResultSet(traversers.request_id, traversers._timeout,
-                               self._loop)
-        self._loop.create_task(self._receive(traversers, result_set))
+        result_set = BoundedResultSet(
+            traversers.request_id, traversers._timeout, self._loop,
+            self._result_buffer_size)
+        stream = ResultStream(result_set, record=cached is not None)
+        task = self._loop.create_task(self._receive(
+            traversers, stream, projected, keys, cached, write))
+        if self._query_cache is not None and write:
+            # Results read while the write was running may be stale
+            task.add_done_callback(lambda _: self._query_cache.invalidate(
+                *(query.labels(bytecode) or ())))
+        # Stop receiving if the result set is dropped before it is consumed
+        weakref.finalize(result_set, task.cancel)
         return RemoteTraversal(result_set, side_effects)
 
-    async def _receive(self, traversers, result_set):
+    def _must_flush(self, bytecode):
+        """Check the flush policy before submitting a traversal"""
+        if self._flush_policy == FlushPolicy.ALWAYS:
+            return True
+        if self._flush_policy == FlushPolicy.NEVER or not self._pending:
+            return False
+        labels = query.labels(bytecode)
+        if labels is None:
+            return True
+        return any(elem.__label__ in labels for elem in self._pending)
+
+    def _cached_traversal(self, results):
+        """Replay results found in the app query cache"""
+        result_set = ResultSet(str(uuid.uuid4()), None, self._loop)
+        for result in results:
+            result_set.queue_result(Message(200, result, ''))
+        result_set.queue_result(None)
+        return RemoteTraversal(result_set, None)
+
+    async def _receive(self, traversers, stream, projected=None, keys=(),
+                       cached=None, fresh=False):
         try:
-            async for result in traversers:
-                result = await self._deserialize_result(result)
-                msg = Message(200, result, '')
-                result_set.queue_result(msg)
+            if self._hydration == HydrationMode.LAZY:
+                async for result in traversers:
+                    if fresh:
+                        self._invalidate_result(result)
+                    result = self._deserialize_lazy(result)
+                    await stream.put(Message(200, result, ''))
+            elif self._hydration == HydrationMode.BATCH and not projected:
+                await self._receive_batched(traversers, stream, keys, fresh)
+            else:
+                async for result in traversers:
+                    if fresh:
+                        self._invalidate_result(result)
+                    if projected:
+                        result = self._deserialize_projection(
+                            result, projected, keys, cached=not fresh)
+                    else:
+                        result = await self._deserialize_result(
+                            result, keys, cached=not fresh)
+                    msg = Message(200, result, '')
+                    await stream.put(msg)
+            if cached is not None:
+                self._cache_results(cached, stream.results)
+        except asyncio.CancelledError:
+            # Abandon the server request, remaining responses are discarded
+            traversers.close()
+            raise
         except Exception as e:
             print("Exception caught, will show up as a msg, traceback here:")
             print(e)
             for line in traceback.format_stack():
                 print(line.strip())
             msg = Message(500, None, e.args[0])
-            result_set.queue_result(msg)
-        finally:
-            result_set.queue_result(None)
+            await stream.put(msg)
+        await stream.put(None)
 
-    async def _deserialize_result(self, result):
+    async def _deserialize_result(self, result, keys=(), *, cached=True):
         if isinstance(result, Traverser):
             bulk = result.bulk
             obj = result.object
             if isinstance(obj, (Vertex, Edge)):
-                hashable_id = self._get_hashable_id(obj.id)
-                current = self.current.get(hashable_id, None)
-                if isinstance(obj, Vertex):
-                    # why doesn't this come in on the vertex?
-                    label = await self._g.V(hashable_id).label().next()
-                    if not current:
-                        current = self.app.vertices.get(label, GenericVertex)()
-                    props = await self._get_vertex_properties(hashable_id, label)
-                if isinstance(obj, Edge):
-                    props = await self._g.E(hashable_id).valueMap(True).next()
-                    if not current:
-                        current = self.app.edges.get(
-                            props.get('label'), GenericEdge)()
-                        current.source = GenericVertex()
-                        current.target = GenericVertex()
-                element = current.__mapping__.mapper_func(obj, props, current)
-                self.current[hashable_id] = element
+                props = await self._fetch_properties(obj, keys, cached=cached)
+                element = self._map_element(obj, props, keys)
                 return Traverser(element, bulk)
+            objs = []
+            self._collect_elements(obj, objs)
+            if objs:
+                # Hydrate everything nested in the result with one lookup
+                elements = await self._hydrate_batch(
+                    objs, keys, cached=cached)
+                obj = self._replace_elements(
+                    obj,
+                    lambda elem: elements[self._get_hashable_id(elem.id)])
+                return Traverser(obj, bulk)
+        return result
+
+    def _invalidate_result(self, result):
+        """Drop the cached state of the elements returned by a write"""
+        if self._element_cache is None or not isinstance(result, Traverser):
+            return
+        objs = []
+        self._collect_elements(result.object, objs)
+        self._element_cache.invalidate(
+            *(self._get_hashable_id(obj.id) for obj in objs))
+
+    def _cache_results(self, cached, results):
+        """Store results that hold no elements in the app query cache"""
+        key, labels = cached
+        objs = []
+        for result in results:
+            self._collect_elements(
+                result.object, objs, (Vertex, Edge, Element))
+            if objs:
+                # Elements belong to the session that loaded them
+                return
+        self._query_cache.put(key, labels, results)
+
+    def _collect_elements(self, obj, objs, types=(Vertex, Edge)):
+        """Find vertices and edges nested in paths, maps and collections"""
+        if isinstance(obj, types):
+            objs.append(obj)
+        elif isinstance(obj, Path):
+            for item in obj.objects:
+                self._collect_elements(item, objs, types)
+        elif isinstance(obj, dict):
+            for key, value in obj.items():
+                self._collect_elements(key, objs, types)
+                self._collect_elements(value, objs, types)
+        elif isinstance(obj, (list, tuple, set)):
+            for item in obj:
+                self._collect_elements(item, objs, types)
+
+    def _replace_elements(self, obj, map_func):
+        """
+        Rebuild a nested result replacing vertices and edges with the OGM
+        elements returned by `map_func`.
+        """
+        if isinstance(obj, (Vertex, Edge)):
+            return map_func(obj)
+        elif isinstance(obj, Path):
+            return Path(obj.labels, [self._replace_elements(item, map_func)
+                                     for item in obj.objects])
+        elif isinstance(obj, dict):
+            return {self._replace_elements(key, map_func):
+                    self._replace_elements(value, map_func)
+                    for key, value in obj.items()}
+        elif isinstance(obj, (list, tuple, set)):
+            return type(obj)(self._replace_elements(item, map_func)
+                             for item in obj)
+        return obj
+
+    def _deserialize_lazy(self, result):
+        if isinstance(result, Traverser):
+            obj = self._replace_elements(result.object, self._map_lazy)
+            return Traverser(obj, result.bulk)
+        return result
+
+    def _map_lazy(self, obj):
+        """
+        Map a db vertex/edge to an OGM element that only has its id and label
+        set. Elements already registered with the session are reused as is.
+        """
+        hashable_id = self._get_hashable_id(obj.id)
+        current = self.current.get(hashable_id, None)
+        if current:
+            return current
+        if isinstance(obj, Vertex):
+            current = self.app.vertices.get(obj.label, GenericVertex)()
+        else:
+            current = self.app.edges.get(obj.label, GenericEdge)()
+            current.source = GenericVertex()
+            current.source.id = obj.outV.id
+            current.target = GenericVertex()
+            current.target.id = obj.inV.id
+        self._make_lazy(current, set(current.__mapping__.ogm_properties))
+        setattr(current, '__label__', obj.label)
+        setattr(current, 'id', obj.id)
+        mapper.track_changes(current)
+        self.current[hashable_id] = current
+        return current
+
+    def _make_lazy(self, element, unloaded):
+        element._unloaded = unloaded
+        element._loader = weakref.WeakMethod(self._load_lazy)
+
+    def _load_lazy(self, element):
+        if self._loop.is_running():
+            raise exception.LazyLoadError(
+                "Properties of lazily loaded element {} cannot be loaded on "
+                "access while the event loop is running, use "
+                "Session.materialize".format(element))
+        self._loop.run_until_complete(self.materialize(element))
+
+    async def materialize(self, *elements):
+        """
+        Load the properties of lazily hydrated elements. Issues one query per
+        element type for every ``batch_size`` elements.
+
+        :param goblin.element.Element elements: Elements to be loaded
+
+        :returns: list of the loaded elements
+        """
+        objs = []
+        targets = {}
+        for elem in elements:
+            if not getattr(elem, '_unloaded', None):
+                continue
+            if elem.__type__ == 'vertex':
+                objs.append(Vertex(elem.id, elem.__label__))
             else:
-                return result
-        # Recursive serialization is broken in goblin
-        elif isinstance(result, dict):
-            for key in result:
-                result[key] = self._deserialize_result(result[key])
-            return result
-        elif isinstance(result, list):
-            return [self._deserialize_result(item) for item in result]
+                objs.append(Edge(elem.id, Vertex(elem.source.id),
+                                 elem.__label__, Vertex(elem.target.id)))
+            # Load the passed elements, even if current holds other objects
+            targets[self._get_hashable_id(elem.id)] = elem
+        for i in range(0, len(objs), self._batch_size):
+            await self._hydrate_batch(
+                objs[i:i + self._batch_size], targets=targets)
+        return list(elements)
+
+    async def _receive_batched(self, traversers, stream, keys=(),
+                               fresh=False):
+        """
+        Queue results in windows of up to ``batch_size`` elements, hydrating
+        each window with :py:meth:`_hydrate_batch`. Results are queued in the
+        order they were received.
+        """
+        window = []
+        num_elements = 0
+        deadline = None
+        while True:
+            timeout = None
+            if num_elements:
+                timeout = max(deadline - self._loop.time(), 0)
+            try:
+                result = await asyncio.wait_for(traversers.__anext__(),
+                                                timeout)
+            except asyncio.TimeoutError:
+                result = None
+            except StopAsyncIteration:
+                break
+            if fresh:
+                self._invalidate_result(result)
+            if result is not None:
+                if (isinstance(result, Traverser) and
+                        isinstance(result.object, (Vertex, Edge))):
+                    if not num_elements:
+                        deadline = self._loop.time() + self._batch_timeout
+                    num_elements += 1
+                elif not window:
+                    result = await self._deserialize_result(
+                        result, keys, cached=not fresh)
+                    await stream.put(Message(200, result, ''))
+                    continue
+                window.append(result)
+                if num_elements < self._batch_size:
+                    continue
+            await self._queue_window(window, stream, keys, fresh)
+            window = []
+            num_elements = 0
+        await self._queue_window(window, stream, keys, fresh)
+
+    async def _queue_window(self, window, stream, keys=(), fresh=False):
+        objs = [result.object for result in window
+                if isinstance(result, Traverser) and
+                isinstance(result.object, (Vertex, Edge))]
+        elements = await self._hydrate_batch(objs, keys, cached=not fresh)
+        for result in window:
+            if (isinstance(result, Traverser) and
+                    isinstance(result.object, (Vertex, Edge))):
+                hashable_id = self._get_hashable_id(result.object.id)
+                result = Traverser(elements[hashable_id], result.bulk)
+            else:
+                result = await self._deserialize_result(
+                    result, keys, cached=not fresh)
+            await stream.put(Message(200, result, ''))
+
+    async def _hydrate_batch(self, objs, keys=(), *, cached=True,
+                             targets=None):
+        """
+        Hydrate db vertices and edges using one query per element type.
+
+        :param list objs: `gremlin_python.structure.graph.Vertex` and
+            `gremlin_python.structure.graph.Edge` objects
+        :param tuple keys: Only fetch these db property names (optional)
+        :param bool cached: Read and store complete property sets in the
+            app element cache
+        :param dict targets: Elements to map the results onto, by hashable
+            id, instead of the elements registered in :py:attr:`current`
+
+        :returns: dict mapping hashable ids to OGM elements
+        """
+        vertices = {}
+        edges = {}
+        for obj in objs:
+            hashable_id = self._get_hashable_id(obj.id)
+            if isinstance(obj, Vertex):
+                vertices[hashable_id] = obj
+            else:
+                edges[hashable_id] = obj
+        elements = {}
+        if not keys and cached:
+            self._map_cached(vertices, elements, targets)
+            self._map_cached(edges, elements, targets)
+        if vertices:
+            projections = await self._g.V(*vertices).map(
+                query.vertex_projection(keys)).toList()
+            for projection in projections:
+                element = self._map_projection(
+                    projection, 'vertex', keys, cached=cached, targets=targets)
+                elements[self._get_hashable_id(element.id)] = element
+        if edges:
+            projections = await self._g.E(*edges).map(
+                query.edge_projection(keys)).toList()
+            for projection in projections:
+                element = self._map_projection(
+                    projection, 'edge', keys, cached=cached, targets=targets)
+                elements[self._get_hashable_id(element.id)] = element
+        # Elements removed before they could be hydrated only get an id
+        for hashable_id, obj in vertices.items():
+            if hashable_id not in elements:
+                elements[hashable_id] = self._map_element(
+                    obj, {'id': hashable_id, 'label': obj.label}, keys,
+                    target=(targets or {}).get(hashable_id))
+        for hashable_id, obj in edges.items():
+            if hashable_id not in elements:
+                elements[hashable_id] = self._map_element(
+                    obj, {T.id: obj.id, T.label: obj.label}, keys,
+                    target=(targets or {}).get(hashable_id))
+        return elements
+
+    def _map_cached(self, objs, elements, targets=None):
+        """
+        Map the elements found in the app element cache, removing them from
+        `objs` so they are not queried.
+        """
+        if self._element_cache is None:
+            return
+        for hashable_id, obj in list(objs.items()):
+            props = self._element_cache.get(hashable_id)
+            if props is not None:
+                elements[hashable_id] = self._map_element(
+                    obj, props, target=(targets or {}).get(hashable_id))
+                del objs[hashable_id]
+
+    def _deserialize_projection(self, result, element_type, keys=(), *,
+                                cached=True):
+        """Map a result emitted by a traversal rewritten for projection"""
+        element = self._map_projection(
+            result.object, element_type, keys, cached=cached)
+        return Traverser(element, result.bulk)
+
+    def _map_projection(self, projection, element_type, keys=(), *,
+                        cached=True, targets=None):
+        obj = projection['element']
+        if element_type == 'vertex':
+            props = self._vertex_properties(
+                projection['properties'], self._get_hashable_id(obj.id),
+                projection['label'])
         else:
-            return result
+            props = projection['properties']
+        hashable_id = self._get_hashable_id(obj.id)
+        if cached and not keys and self._element_cache is not None:
+            self._element_cache.put(hashable_id, props)
+        return self._map_element(
+            obj, props, keys, target=(targets or {}).get(hashable_id))
+
+    async def _fetch_properties(self, obj, keys=(), *, cached=True):
+        """
+        Fetch the label and properties of a db vertex/edge. Complete
+        property sets are read from, and stored in, the app element cache
+        unless `cached` is `False`.
+        """
+        hashable_id = self._get_hashable_id(obj.id)
+        cached = cached and not keys and self._element_cache is not None
+        if cached:
+            props = self._element_cache.get(hashable_id)
+            if props is not None:
+                return props
+        if isinstance(obj, Vertex):
+            # why doesn't this come in on the vertex?
+            label = await self._g.V(hashable_id).label().next()
+            props = await self._get_vertex_properties(hashable_id, label, keys)
+        else:
+            props = await self._g.E(hashable_id).valueMap(True, *keys).next()
+        if cached:
+            self._element_cache.put(hashable_id, props)
+        return props
+
+    def _invalidate(self, element, removed=False):
+        """
+        Drop the cached state of an element that was written or removed,
+        and the cached results of traversals that touch its label.
+        """
+        if self._element_cache is not None and element.id is not None:
+            self._element_cache.invalidate(self._get_hashable_id(element.id))
+        if self._query_cache is not None:
+            if removed and element.__type__ == 'vertex':
+                # Edges of any label are removed together with the vertex
+                self._query_cache.invalidate()
+            else:
+                self._query_cache.invalidate(element.__label__)
 
-    async def _get_vertex_properties(self, vid, label):
-        projection = self._g.V(vid).properties() \
+    def _map_element(self, obj, props, keys=(), target=None):
+        """
+        Map a db vertex/edge and its properties onto the OGM element
+        registered with the session for its id, or onto `target`, creating
+        it if necessary. If `keys` is passed, only those db properties were
+        fetched and the remaining properties of a new element are loaded
+        lazily.
+        """
+        hashable_id = self._get_hashable_id(obj.id)
+        current = target
+        if current is None:
+            current = self.current.get(hashable_id, None)
+        new = not current
+        if isinstance(obj, Vertex):
+            if new:
+                current = self.app.vertices.get(props['label'], GenericVertex)()
+        else:
+            if new:
+                current = self.app.edges.get(props.get('label'), GenericEdge)()
+                current.source = GenericVertex()
+                current.target = GenericVertex()
+        mapping = current.__mapping__
+        fetched = set(mapping.ogm_properties)
+        if keys:
+            fetched = set(mapping.db_properties[key][0] for key in keys
+                          if key in mapping.db_properties)
+        unloaded = getattr(current, '_unloaded', None)
+        changes = getattr(current, '_changes', None) or frozenset()
+        if new and keys:
+            self._make_lazy(current, set(mapping.ogm_properties) - fetched)
+        elif unloaded is not None:
+            # Keep values assigned to a lazy element before it was loaded
+            props = {
+                key: val for key, val in props.items()
+                if key not in mapping.db_properties or
+                mapping.db_properties[key][0] in unloaded}
+            current._unloaded = unloaded - fetched
+        # Assignments the db values are about to overwrite are discarded
+        changes = changes - set(mapping.db_properties[key][0] for key in props
+                                if key in mapping.db_properties)
+        element = current.__mapping__.mapper_func(obj, props, current)
+        mapper.track_changes(element, changes)
+        self.current[hashable_id] = element
+        return element
+
+    async def _get_vertex_properties(self, vid, label, keys=()):
+        projection = self._g.V(vid).properties(*keys) \
                             .project('id', 'key', 'value', 'meta') \
                             .by(__.id()).by(__.key()).by(__.value()) \
                             .by(__.valueMap())
         props = await projection.toList()
+        return self._vertex_properties(props, vid, label)
+
+    def _vertex_properties(self, props, vid, label):
         new_props = {'label': label, 'id': vid}
         for prop in props:
             key = prop['key']
@@ -234,6 +820,52 @@ class Session:
         """
         for elem in elements:
             self._pending.append(elem)
+            self._pending_counts[id(elem)] += 1
+        self._schedule_autoflush()
+
+    def _pop_pending(self):
+        """Take the next element out of the pending queue"""
+        elem = self._pending.popleft()
+        self._pending_counts[id(elem)] -= 1
+        if not self._pending_counts[id(elem)]:
+            del self._pending_counts[id(elem)]
+        return elem
+
+    def _schedule_autoflush(self):
+        if not self._pending:
+            return
+        if (self._autoflush_size and
+                len(self._pending) >= self._autoflush_size):
+            self._start_autoflush()
+        elif self._autoflush_interval and self._autoflush_timer is None:
+            self._autoflush_timer = self._loop.call_later(
+                self._autoflush_interval, self._start_autoflush)
+
+    def _start_autoflush(self):
+        self._cancel_autoflush_timer()
+        if self._autoflush_task is None:
+            self._autoflush_task = self._loop.create_task(self._autoflush())
+            self._autoflush_task.add_done_callback(self._autoflush_done)
+
+    def _autoflush_done(self, task):
+        self._autoflush_task = None
+        # Elements added during the flush may have reached autoflush_size
+        if not task.cancelled() and self._autoflush_exception is None:
+            self._schedule_autoflush()
+
+    def _cancel_autoflush_timer(self):
+        if self._autoflush_timer is not None:
+            self._autoflush_timer.cancel()
+            self._autoflush_timer = None
+
+    async def _autoflush(self):
+        try:
+            await self.flush()
+        except Exception as e:
+            if self._autoflush_error is None:
+                self._autoflush_exception = e
+            else:
+                self._autoflush_error(e)
 
     async def flush(
                     self,
@@ -241,47 +873,428 @@ class Session:
                   ) -> None:
         """
         Issue creation/update queries to database for all elements in the
-        session pending queue.
+        session pending queue. Waits for a running background flush first,
+        and raises the exception of a failed background flush, if any. With
+        a sessioned connection to a transactional provider, all the queries
+        run in one server transaction.
+        """
+        async with self._flush_lock:
+            self._cancel_autoflush_timer()
+            if self._autoflush_exception is not None:
+                exc, self._autoflush_exception = \
+                    self._autoflush_exception, None
+                raise exc
+            if not self._pending:
+                return
+            try:
+                if self._transactions:
+                    await self._flush_transaction(conflicts_query)
+                else:
+                    await self._flush(conflicts_query)
+            finally:
+                self._schedule_autoflush()
+
+    async def _flush_transaction(self, conflicts_query=None):
+        """
+        Flush in a single server transaction, committed once all pending
+        elements are saved and rolled back if any save fails. Other
+        traversals submitted by the session meanwhile join the transaction.
         """
+        remote_connection = self.remote_connection
+        remote_connection.begin()
+        try:
+            await self._flush(conflicts_query)
+        except Exception:
+            await remote_connection.rollback()
+            raise
+        await remote_connection.commit()
+
+    async def _flush(self, conflicts_query=None):
         transaction_id = str(uuid.uuid4())
         processed = []
+        await self.materialize(*self._pending)
         try:
-            while self._pending:
-                elem = self._pending.popleft()
-                actual_id = self.__dirty_element(elem, id=transaction_id)
-                if actual_id:
-                    processed.append(await self.save(elem))
-                else:
-                    await self.save(elem)
+            if self._flush_batch_size:
+                await self._flush_batched(transaction_id, processed)
+            else:
+                elems = []
+                while self._pending:
+                    elem = self._pop_pending()
+                    if self.__dirty_element(elem, id=transaction_id):
+                        processed.append(elem)
+                    elems.append(elem)
+                await self._save_all(elems)
 
             if not processed: return
             if not conflicts_query:
-                await self.__commit_transaction(transaction_id)
+                await self.__commit_transaction(transaction_id, processed)
             else:
-                await (self.
-                       g.
-                       E().
-                       has('dirty', transaction_id).
-                       aggregate('x').
-                       fold().
-                       V().
-                       has('dirty', transaction_id).
-                       aggregate('x').
-                       choose(
-                           conflicts_query,
-
-                           __.
-                           select('x').
-                           unfold().
-                           properties('dirty').
-                           drop()).
-                       iterate())  # type: ignore
-                await self.__rollback_transaction(transaction_id)
+                # The conflict check runs on the marked vertices, there are
+                # none if only edges with ids were written
+                if any(elem.__type__ == 'vertex' or not hasattr(elem, 'id')
+                       for elem in processed):
+                    await (self.
+                           _marked_elements(transaction_id, processed).
+                           choose(
+                               conflicts_query,
+
+                               __.
+                               select('x').
+                               unfold().
+                               properties('dirty').
+                               drop()).
+                           iterate())  # type: ignore
+                await self.__rollback_transaction(transaction_id, processed)
         except Exception as e:
-            await self.__rollback_transaction(transaction_id)
+            await self.__rollback_transaction(transaction_id, processed)
+            # Requeued elements were not written, they are marked again by
+            # the next flush
+            for elem in processed:
+                if (id(elem) in self._pending_counts and
+                        elem.dirty == transaction_id):
+                    self._clear_dirty(elem)
             raise e
         for elem in processed:
-            elem.dirty = None
+            self._clear_dirty(elem)
+
+    async def _flush_batched(self, transaction_id, processed):
+        """
+        Create new pending elements in chunks of `flush_batch_size`. Runs of
+        other elements are saved with :py:meth:`_save_all` in queue order.
+
+        :param list processed: Receives the elements marked with
+            `transaction_id`
+        """
+        batch = []
+        batched = set()
+        group = []
+        while self._pending:
+            # Elements stay queued until the previous run is written
+            elem = self._pending[0]
+            if self._is_batchable(elem, batched):
+                await self._save_all(group)
+                group = []
+                batch.append(elem)
+                batched.add(id(elem))
+            else:
+                # An element added again is updated once its batch created it
+                await self._create_batch(batch)
+                batch = []
+                batched = set()
+                group.append(elem)
+            self._pop_pending()
+            if self.__dirty_element(elem, id=transaction_id):
+                processed.append(elem)
+            if len(batch) >= self._flush_batch_size:
+                await self._create_batch(batch)
+                batch = []
+                batched = set()
+        await self._create_batch(batch)
+        await self._save_all(group)
+
+    async def _save_all(self, elems):
+        """
+        Save elements one dependency wave at a time, running up to
+        `flush_concurrency` saves of the same wave concurrently. If a save
+        fails, the elements that were not saved yet are put back in the
+        pending queue.
+        """
+        if self._flush_concurrency <= 1:
+            for i, elem in enumerate(elems):
+                try:
+                    await self.save(elem)
+                except Exception:
+                    self._requeue(elems[i + 1:])
+                    raise
+            return
+        semaphore = asyncio.Semaphore(self._flush_concurrency)
+
+        async def save(elem):
+            async with semaphore:
+                await self.save(elem)
+
+        waves = self._dependency_waves(elems)
+        for i, wave in enumerate(waves):
+            results = await asyncio.gather(
+                *(save(elem) for elem in wave), return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    self._requeue_unsaved(elems, waves[i + 1:])
+                    raise result
+
+    def _requeue_unsaved(self, elems, waves):
+        """Requeue the elements of the waves left unsaved, in queue order"""
+        unsaved = collections.Counter(
+            id(elem) for wave in waves for elem in wave)
+        rest = []
+        # Later occurrences of an element are saved in later waves
+        for elem in reversed(elems):
+            if unsaved[id(elem)]:
+                unsaved[id(elem)] -= 1
+                rest.append(elem)
+        self._requeue(rest[::-1])
+
+    def _requeue(self, elems):
+        """Put elements back at the front of the pending queue"""
+        self._pending.extendleft(reversed(elems))
+        for elem in elems:
+            self._pending_counts[id(elem)] += 1
+
+    def _dependency_waves(self, elems):
+        """
+        Group elements into waves that only depend on earlier waves. Edges
+        depend on their pending vertices, and an element added more than
+        once depends on its previous occurrence.
+
+        :returns: `list` of `list` of elements, in queue order
+        """
+        levels = {}
+        waves = []
+        vertices = [elem for elem in elems if elem.__type__ != 'edge']
+        edges = [elem for elem in elems if elem.__type__ == 'edge']
+        for elem in vertices + edges:
+            level = levels.get(id(elem), -1) + 1
+            if elem.__type__ == 'edge':
+                for vertex in (getattr(elem, 'source', None),
+                               getattr(elem, 'target', None)):
+                    if id(vertex) in levels:
+                        level = max(level, levels[id(vertex)] + 1)
+            levels[id(elem)] = level
+            if level == len(waves):
+                waves.append([])
+            waves[level].append(elem)
+        return waves
+
+    def _is_batchable(self, elem, batched):
+        """
+        New vertices can be batched once. New edges can be batched once if
+        their vertices exist or are created by the same batch.
+
+        :param set batched: `id()` of the elements in the batch
+        """
+        if hasattr(elem, 'id') or id(elem) in batched:
+            return False
+        if elem.__type__ == 'vertex':
+            return True
+        if not (hasattr(elem, 'source') and hasattr(elem, 'target')):
+            return False
+        for vertex in (elem.source, elem.target):
+            if not (hasattr(vertex, 'id') or id(vertex) in batched):
+                return False
+        return True
+
+    async def _create_batch(self, elems, register=True):
+        """
+        Create elements with a single traversal, e.g.
+        ``addV('person').as_('e0').addV('person').as_('e1')
+        .addE('knows').from_(__.select('e0')).to(__.select('e1')).as_('e2')``,
+        and set the ids of the created elements.
+
+        :param bool register: Add the created elements to :py:attr:`current`
+        """
+        if not elems:
+            return
+        traversal = self._g
+        aliases = {}
+        for elem in elems:
+            self._init_version(elem)
+            props = elem.__mapping__.props_func(elem)
+            if elem.__type__ == 'vertex':
+                traversal = traversal.addV(elem.__mapping__.label)
+            else:
+                traversal = traversal.addE(elem.__mapping__.label) \
+                    .from_(self._batch_vertex(elem.source, aliases)) \
+                    .to(self._batch_vertex(elem.target, aliases))
+            alias = 'e{}'.format(len(aliases))
+            traversal = self._property_steps(traversal, props).as_(alias)
+            aliases[id(elem)] = alias
+        if len(elems) == 1:
+            ids = [await traversal.id().next()]
+        else:
+            keys = list(aliases.values())
+            result = await traversal.select(*keys).by(__.id()).next()
+            ids = [result[key] for key in keys]
+        for elem, eid in zip(elems, ids):
+            elem.id = eid
+            mapper.track_changes(elem)
+            self._invalidate(elem)
+            if register:
+                self.current[self._get_hashable_id(eid)] = elem
+
+    def _batch_vertex(self, vertex, aliases):
+        """Anonymous traversal to an edge vertex in a batch"""
+        if id(vertex) in aliases:
+            return __.select(aliases[id(vertex)])
+        return __.V(vertex.id)
+
+    async def bulk_load(self, elements, *, batch_size=1000, concurrency=1,
+                        progress=None):
+        """
+        Create new elements consumed from an iterable with batched
+        traversals. Elements are neither queued nor added to
+        :py:attr:`current`, so they can be garbage collected once written.
+        Edges may connect vertices loaded by earlier batches, batches wait
+        for the batches creating their vertices.
+
+        :param elements: Iterable or async iterable of new
+            :py:class:`Element<goblin.element.Element>` objects
+        :param int batch_size: Maximum number of elements created by each
+            traversal
+        :param int concurrency: Maximum number of batches written
+            concurrently
+        :param progress: Callable receiving a :py:class:`BulkLoadProgress`
+            after each batch is written
+
+        :returns: :py:class:`BulkLoadProgress` totals
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        loading = {}
+        tasks = set()
+        failed = []
+        written = [0, 0]
+        start = self._loop.time()
+
+        def report():
+            elapsed = self._loop.time() - start
+            rate = written[0] / elapsed if elapsed else 0.0
+            return BulkLoadProgress(written[0], written[1], elapsed, rate)
+
+        async def write(batch, dependencies):
+            try:
+                if dependencies:
+                    await asyncio.gather(*dependencies)
+                await self._create_batch(batch, register=False)
+            finally:
+                semaphore.release()
+            written[0] += len(batch)
+            written[1] += 1
+            if progress is not None:
+                progress(report())
+
+        def done(task, batch):
+            tasks.discard(task)
+            for elem in batch:
+                if loading.get(id(elem)) is task:
+                    del loading[id(elem)]
+            # Keep the first failure, it is raised by the load
+            if not task.cancelled() and task.exception() and not failed:
+                failed.append(task.exception())
+
+        async def launch(batch):
+            await semaphore.acquire()
+            if failed:
+                semaphore.release()
+                raise failed[0]
+            dependencies = set()
+            for elem in batch:
+                if elem.__type__ == 'edge':
+                    for vertex in (elem.source, elem.target):
+                        if id(vertex) in loading:
+                            dependencies.add(loading[id(vertex)])
+            task = self._loop.create_task(write(batch, dependencies))
+            tasks.add(task)
+            for elem in batch:
+                if elem.__type__ == 'vertex':
+                    loading[id(elem)] = task
+            task.add_done_callback(lambda task: done(task, batch))
+
+        batch = []
+        batched = set()
+        try:
+            async for elem in self._iterate(elements):
+                self._check_bulk_element(elem, batched, loading)
+                batch.append(elem)
+                batched.add(id(elem))
+                if len(batch) >= batch_size:
+                    await launch(batch)
+                    batch = []
+                    batched = set()
+            if batch:
+                await launch(batch)
+        finally:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if failed:
+            raise failed[0]
+        return report()
+
+    async def _iterate(self, elements):
+        if hasattr(elements, '__aiter__'):
+            async for elem in elements:
+                yield elem
+        else:
+            for elem in elements:
+                yield elem
+
+    def _check_bulk_element(self, elem, batched, loading):
+        if hasattr(elem, 'id'):
+            raise exception.ElementError(
+                "Bulk load only creates new elements: {}".format(elem))
+        if elem.__type__ != 'edge':
+            return
+        if not (hasattr(elem, 'source') and hasattr(elem, 'target')):
+            raise exception.ElementError(
+                "Edges require both source/target vertices")
+        for vertex in (elem.source, elem.target):
+            if not (hasattr(vertex, 'id') or id(vertex) in batched or
+                    id(vertex) in loading):
+                raise exception.ElementError(
+                    "Vertex {} of edge {} was not loaded".format(vertex, elem))
+
+    def _edge_ids(self, eids):
+        """Bind edge ids that are maps, e.g. JanusGraph relation ids"""
+        return [Binding('eid{}'.format(i), eid) if isinstance(eid, dict)
+                else eid for i, eid in enumerate(eids)]
+
+    async def remove_vertices(self, vertices, *, chunk_size=None):
+        """
+        Remove many vertices, and their edges, from the db using one
+        traversal per chunk of ids. Removed vertices are not re-read.
+
+        :param vertices: Iterable of vertex ids or
+            :py:class:`Vertex<goblin.element.Vertex>` objects
+        :param int chunk_size: Maximum number of vertices removed by each
+            traversal. Defaults to the session `batch_size`
+        """
+        await self._remove_elements(vertices, 'vertex', chunk_size)
+
+    async def remove_edges(self, edges, *, chunk_size=None):
+        """
+        Remove many edges from the db using one traversal per chunk of ids.
+        Removed edges are not re-read.
+
+        :param edges: Iterable of edge ids or
+            :py:class:`Edge<goblin.element.Edge>` objects
+        :param int chunk_size: Maximum number of edges removed by each
+            traversal. Defaults to the session `batch_size`
+        """
+        await self._remove_elements(edges, 'edge', chunk_size)
+
+    async def _remove_elements(self, elements, element_type, chunk_size=None):
+        elements = list(elements)
+        ids = [elem.id if isinstance(elem, Element) else elem
+               for elem in elements]
+        chunk_size = chunk_size or self._batch_size
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            if element_type == 'vertex':
+                traversal = self._g.V(*chunk)
+            else:
+                traversal = self._g.E(*self._edge_ids(chunk))
+            await traversal.drop().iterate()
+        hashable_ids = [self._get_hashable_id(eid) for eid in ids]
+        for hashable_id in hashable_ids:
+            self.current.pop(hashable_id, None)
+        if self._element_cache is not None:
+            self._element_cache.invalidate(*hashable_ids)
+        if self._query_cache is not None and ids:
+            if element_type == 'edge' and all(
+                    isinstance(elem, Element) for elem in elements):
+                self._query_cache.invalidate(
+                    *set(elem.__label__ for elem in elements))
+            else:
+                # Vertices are removed with edges of any label, and the
+                # labels of elements passed by id are unknown
+                self._query_cache.invalidate()
 
     async def remove_vertex(self, vertex):
         """
@@ -291,6 +1304,7 @@ class Session:
         """
         traversal = self._g.V(Binding('vid', vertex.id)).drop()
         result = await self._simple_traversal(traversal, vertex)
+        self._invalidate(vertex, removed=True)
         hashable_id = self._get_hashable_id(vertex.id)
         if hashable_id in self.current:
             vertex = self.current.pop(hashable_id)
@@ -312,6 +1326,7 @@ class Session:
             eid = Binding('eid', edge.id)
         traversal = self._g.E(eid).drop()
         result = await self._simple_traversal(traversal, edge)
+        self._invalidate(edge, removed=True)
         hashable_id = self._get_hashable_id(edge.id)
         if hashable_id in self.current:
             edge = self.current.pop(hashable_id)
@@ -330,6 +1345,7 @@ class Session:
 
         :returns: :py:class:`Element<goblin.element.Element>` object
         """
+        await self.materialize(elem)
         if elem.__type__ == 'vertex':
             result = await self.save_vertex(elem)
         elif elem.__type__ == 'edge':
@@ -348,7 +1364,9 @@ class Session:
         :returns: :py:class:`Vertex<goblin.element.Vertex>` object
         """
         result = await self._save_element(
-            vertex, self._check_vertex, self._add_vertex, self._update_vertex)
+            vertex, self._check_vertex, self._add_vertex, self._update_vertex,
+            self._upsert_vertex)
+        self._invalidate(result)
         hashable_id = self._get_hashable_id(result.id)
         self.current[hashable_id] = result
         return result
@@ -365,7 +1383,9 @@ class Session:
             raise exception.ElementError(
                 "Edges require both source/target vertices")
         result = await self._save_element(edge, self._check_edge,
-                                          self._add_edge, self._update_edge)
+                                          self._add_edge, self._update_edge,
+                                          self._upsert_edge)
+        self._invalidate(result)
         hashable_id = self._get_hashable_id(result.id)
         self.current[hashable_id] = result
         return result
@@ -393,6 +1413,71 @@ class Session:
             eid = Binding('eid', edge.id)
         return await self.g.E(eid).next()
 
+    async def get_vertices(self, vertices, *, chunk_size=None):
+        """
+        Get many vertices from the db, using one traversal per chunk of
+        ids. Vertices already loaded by the session are not fetched again.
+
+        :param vertices: Iterable of vertex ids or
+            :py:class:`Vertex<goblin.element.Vertex>` objects
+        :param int chunk_size: Maximum number of vertices fetched by each
+            traversal. Defaults to the session `batch_size`
+
+        :returns: `list` of :py:class:`Vertex<goblin.element.Vertex>`
+            objects in input order, `None` for vertices that were not found
+        """
+        return await self._get_elements(vertices, 'vertex', chunk_size)
+
+    async def get_edges(self, edges, *, chunk_size=None):
+        """
+        Get many edges from the db, using one traversal per chunk of ids.
+        Edges already loaded by the session are not fetched again.
+
+        :param edges: Iterable of edge ids or
+            :py:class:`Edge<goblin.element.Edge>` objects
+        :param int chunk_size: Maximum number of edges fetched by each
+            traversal. Defaults to the session `batch_size`
+
+        :returns: `list` of :py:class:`Edge<goblin.element.Edge>` objects in
+            input order, `None` for edges that were not found
+        """
+        return await self._get_elements(edges, 'edge', chunk_size)
+
+    async def _get_elements(self, elements, element_type, chunk_size=None):
+        ids = [elem.id if isinstance(elem, Element) else elem
+               for elem in elements]
+        hashable_ids = [self._get_hashable_id(eid) for eid in ids]
+        found = {}
+        missing = {}
+        for eid, hashable_id in zip(ids, hashable_ids):
+            if hashable_id in found or hashable_id in missing:
+                continue
+            current = self.current.get(hashable_id, None)
+            if current is not None:
+                found[hashable_id] = current
+            else:
+                missing[hashable_id] = eid
+        if element_type == 'vertex':
+            # Vertices can be mapped from cached state with only their id
+            objs = {hashable_id: Vertex(eid)
+                    for hashable_id, eid in missing.items()}
+            self._map_cached(objs, found)
+            missing = {hashable_id: missing[hashable_id]
+                       for hashable_id in objs}
+        missing = list(missing.values())
+        chunk_size = chunk_size or self._batch_size
+        for start in range(0, len(missing), chunk_size):
+            chunk = missing[start:start + chunk_size]
+            if element_type == 'vertex':
+                traversal = self._g.V(*chunk).map(query.vertex_projection())
+            else:
+                traversal = self._g.E(*self._edge_ids(chunk)).map(
+                    query.edge_projection())
+            for projection in await traversal.toList():
+                element = self._map_projection(projection, element_type)
+                found[self._get_hashable_id(element.id)] = element
+        return [found.get(hashable_id) for hashable_id in hashable_ids]
+
     def __dirty_element(self, elem, id = str(uuid.uuid4())):
         if elem.__locking__ and elem.__locking__ == LockingMode.OPTIMISTIC_LOCKING:
             if not elem.dirty:
@@ -402,11 +1487,44 @@ class Session:
                 return elem.dirty
         return None
 
-    async def __commit_transaction(self, id):
-        if id: await self._g.E().has('dirty',id).aggregate('x').fold().V().has('dirty',id).aggregate('x').select('x').unfold().properties('dirty').drop().iterate()
+    def _clear_dirty(self, elem):
+        """Reset the transaction marker after it was dropped from the db"""
+        elem.dirty = None
+        changes = getattr(elem, '_changes', None)
+        if changes:
+            elem._changes = changes - {'dirty'}
+
+    async def __commit_transaction(self, id, elems):
+        if id and elems: await self._marked_elements(id, elems).fold().select('x').unfold().properties('dirty').drop().iterate()
 
-    async def __rollback_transaction(self, id):
-        if id: await self._g.E().has('dirty',id).aggregate('x').fold().V().has('dirty',id).aggregate('x').select('x').unfold().drop().iterate()
+    async def __rollback_transaction(self, id, elems):
+        if id and elems: await self._marked_elements(id, elems).fold().select('x').unfold().drop().iterate()
+
+    def _marked_elements(self, transaction_id, elems):
+        """
+        Traversal that aggregates the elements marked with `transaction_id`
+        into the side effect ``x``. Elements are looked up by id, the graph
+        is only scanned if an element that may have been written has no id.
+
+        :param list elems: Elements written by the transaction
+        """
+        if not all(hasattr(elem, 'id') for elem in elems):
+            return self._g.E().has('dirty', transaction_id).aggregate('x') \
+                          .fold().V().has('dirty', transaction_id) \
+                          .aggregate('x')
+        vids = [elem.id for elem in elems if elem.__type__ == 'vertex']
+        eids = self._edge_ids(
+            [elem.id for elem in elems if elem.__type__ == 'edge'])
+        traversal = self._g
+        if eids:
+            traversal = traversal.E(*eids).has('dirty', transaction_id) \
+                                 .aggregate('x')
+            if vids:
+                traversal = traversal.fold()
+        if vids:
+            traversal = traversal.V(*vids).has('dirty', transaction_id) \
+                                 .aggregate('x')
+        return traversal
 
     async def _update_vertex(self, vertex):
         """
@@ -416,8 +1534,14 @@ class Session:
 
         :returns: :py:class:`Vertex<goblin.element.Vertex>` object
         """
-        props = mapper.map_props_to_db(vertex, vertex.__mapping__)
         traversal = self._g.V(Binding('vid', vertex.id))
+        if vertex.__locking__ == LockingMode.VERSION_COUNTER:
+            return await self._update_versioned(vertex, traversal)
+        changes = mapper.map_changes_to_db(vertex, vertex.__mapping__)
+        if changes is not None:
+            traversal = self._change_steps(traversal, *changes)
+            return await self._simple_traversal(traversal, vertex)
+        props = vertex.__mapping__.props_func(vertex)
         return await self._update_vertex_properties(vertex, traversal, props)
 
     async def _update_edge(self, edge):
@@ -428,26 +1552,73 @@ class Session:
 
         :returns: :py:class:`Edge<goblin.element.Edge>` object
         """
-        props = mapper.map_props_to_db(edge, edge.__mapping__)
         eid = edge.id
         if isinstance(eid, dict):
             eid = Binding('eid', edge.id)
         traversal = self._g.E(eid)
+        if edge.__locking__ == LockingMode.VERSION_COUNTER:
+            return await self._update_versioned(edge, traversal)
+        changes = mapper.map_changes_to_db(edge, edge.__mapping__)
+        if changes is not None:
+            traversal = self._change_steps(traversal, *changes)
+            return await self._simple_traversal(traversal, edge)
+        props = edge.__mapping__.props_func(edge)
         return await self._update_edge_properties(edge, traversal, props)
 
+    async def _update_versioned(self, elem, traversal):
+        """
+        Update an element only if its version in the db is the version it
+        was loaded with, incrementing the version in the same traversal.
+
+        :raises goblin.exception.ConflictError: If the element was updated
+            by someone else
+        """
+        mapping = elem.__mapping__
+        db_name = mapping.ogm_properties['version'][0]
+        version = elem.version
+        if version is None:
+            traversal = traversal.hasNot(db_name)
+        else:
+            traversal = traversal.has(db_name, version)
+        elem.version = (version or 0) + 1
+        changes = mapper.map_changes_to_db(elem, mapping)
+        if changes is None:
+            changes = (mapping.props_func(elem),
+                       [name for name, _ in mapping.ogm_properties.values()])
+        try:
+            result = await self._simple_traversal(
+                self._change_steps(traversal, *changes), elem)
+        except Exception:
+            elem.version = version
+            raise
+        if result is None:
+            elem.version = version
+            raise exception.ConflictError(
+                "Element {} was changed since version {}".format(
+                    elem, version))
+        return result
+
+    def _init_version(self, elem):
+        """Versioned elements are created with version 1"""
+        if (elem.__locking__ == LockingMode.VERSION_COUNTER and
+                elem.version is None):
+            elem.version = 1
+
     # *metodos especiales privados for creation API
 
     async def _simple_traversal(self, traversal, element):
+        if self._write_only:
+            eid = await traversal.id().next()
+            if eid is None:
+                return None
+            element.id = eid
+            mapper.track_changes(element)
+            return element
         elem = await traversal.next()
         if elem:
-            if element.__type__ == 'vertex':
-                # Look into this
-                label = await self._g.V(self._get_hashable_id(elem.id)).label().next()
-                props = await self._get_vertex_properties(self._get_hashable_id(elem.id), label)
-            elif element.__type__ == 'edge':
-                props = await self._g.E(self._get_hashable_id(elem.id)).valueMap(True).next()
-
+            props = await self._fetch_properties(elem, cached=False)
             elem = element.__mapping__.mapper_func(elem, props, element)
+            mapper.track_changes(elem)
         return elem
 
 
@@ -459,18 +1630,25 @@ class Session:
                 result = None
                 try:
                     result = await create_func(elem)
-                    await self.__commit_transaction(transaction_id)
-                    result.dirty = None
+                    await self.__commit_transaction(transaction_id, [elem])
+                    self._clear_dirty(result)
                 except Exception as e:
-                    await self.__rollback_transaction(transaction_id)
+                    await self.__rollback_transaction(transaction_id, [elem])
                     raise e
                 return result
 
         return await create_func(elem)
 
 
-    async def _save_element(self, elem, check_func, create_func, update_func):
+    async def _save_element(self, elem, check_func, create_func, update_func,
+                            upsert_func=None):
         if hasattr(elem, 'id'):
+            changes = mapper.map_changes_to_db(elem, elem.__mapping__)
+            if changes is not None and not changes[1]:
+                # Nothing changed since the element was loaded or saved
+                return elem
+            if self._upsert and upsert_func and self._can_upsert(elem):
+                return await upsert_func(elem)
             exists = await check_func(elem)
             if not exists:
                 result = await self.__handle_create_func(elem, create_func)
@@ -481,15 +1659,73 @@ class Session:
             result = await self.__handle_create_func(elem, create_func)
         return result
 
+    def _can_upsert(self, elem):
+        """Upserts skip the immutability and locking checks"""
+        if elem.__immutable__ and elem.__immutable__ != ImmutableMode.OFF:
+            return False
+        return elem.__locking__ not in (LockingMode.OPTIMISTIC_LOCKING,
+                                        LockingMode.VERSION_COUNTER)
+
+    async def _upsert_vertex(self, vertex):
+        """
+        Update a vertex, or create it if it doesn't exist, in one traversal.
+        """
+        create = __.addV(vertex.__mapping__.label)
+        traversal = self._g.V(Binding('vid', vertex.id)).fold().coalesce(
+            *self._upsert_steps(vertex, __.unfold(), create))
+        return await self._simple_traversal(traversal, vertex)
+
+    async def _upsert_edge(self, edge):
+        """
+        Update an edge, or create it if it doesn't exist, in one traversal.
+        """
+        eid = edge.id
+        if isinstance(eid, dict):
+            eid = Binding('eid', edge.id)
+        create = __.addE(edge.__mapping__.label) \
+                   .from_(__.V(Binding('sid', edge.source.id))) \
+                   .to(__.V(Binding('tid', edge.target.id)))
+        traversal = self._g.E(eid).fold().coalesce(
+            *self._upsert_steps(edge, __.unfold(), create))
+        return await self._simple_traversal(traversal, edge)
+
+    def _upsert_steps(self, elem, update, create):
+        """
+        Add the property steps to the update and create branches of an
+        upsert. Only changed properties are updated if changes are tracked.
+        """
+        props = elem.__mapping__.props_func(elem)
+        changes = mapper.map_changes_to_db(elem, elem.__mapping__)
+        if changes is None:
+            update = self._property_steps(
+                update.sideEffect(__.properties().drop()), props)
+        else:
+            update = self._change_steps(update, *changes)
+        return update, self._property_steps(create, props)
+
+    def _change_steps(self, traversal, props, db_names):
+        """
+        Append the steps that replace the changed properties of an element.
+
+        :param list props: Changed properties as returned by
+            :py:func:`map_changes_to_db<goblin.mapper.map_changes_to_db>`
+        :param list db_names: Names of the properties to replace
+        """
+        if db_names:
+            traversal = traversal.sideEffect(__.properties(*db_names).drop())
+        return self._property_steps(traversal, props)
+
     async def _add_vertex(self, vertex):
         """Convenience function for generating crud traversals."""
-        props = mapper.map_props_to_db(vertex, vertex.__mapping__)
+        self._init_version(vertex)
+        props = vertex.__mapping__.props_func(vertex)
         traversal = self._g.addV(vertex.__mapping__.label)
         return await self._add_properties(traversal, props, vertex)
 
     async def _add_edge(self, edge):
         """Convenience function for generating crud traversals."""
-        props = mapper.map_props_to_db(edge, edge.__mapping__)
+        self._init_version(edge)
+        props = edge.__mapping__.props_func(edge)
         traversal = self._g.V(Binding('sid', edge.source.id))
         traversal = traversal.addE(edge.__mapping__._label)
         traversal = traversal.to(__.V(Binding('tid', edge.target.id)))
@@ -516,6 +1752,16 @@ class Session:
         return await self._add_properties(traversal, props, edge)
 
     async def _add_properties(self, traversal, props, elem):
+        traversal = self._property_steps(traversal, props)
+        return await self._simple_traversal(traversal, elem)
+
+    def _property_steps(self, traversal, props):
+        """
+        Append the steps that set properties to a traversal.
+
+        :param list props: Properties as returned by
+            :py:func:`map_props_to_db<goblin.mapper.map_props_to_db>`
+        """
         binding = 0
         for card, db_name, val, metaprops in props:
             if not metaprops:
@@ -546,4 +1792,4 @@ class Session:
                     ]
                     traversal = traversal.property(key, val, *metas)
                 binding += 1
-        return await self._simple_traversal(traversal, elem)
+        return traversal
@@ -1,7 +1,7 @@
 import pytest
 
 import goblin
-from goblin import element
+from goblin import driver, element, exception
 
 
 @pytest.mark.asyncio
@@ -53,3 +53,53 @@ async def test_aliases(app, aliases):
     session = await app.session()
     assert session._remote_connection._client.aliases == aliases
     await app.close()
+
+
+@pytest.mark.asyncio
+async def test_session_processor(app, person_class):
+    session = await app.session(processor='session')
+    assert isinstance(session.remote_connection,
+                      driver.SessionRemoteConnection)
+    person = person_class()
+    person.name = 'leif'
+    session.add(person)
+    await session.flush()
+    assert not session.remote_connection.in_transaction
+    result = await session.g.V(person.id).next()
+    assert result is person
+    assert await session.g.V(person.id).count().next() == 1
+    session.close()
+    await app.close()
+
+
+@pytest.mark.asyncio
+async def test_session_empty_transaction():
+    class Results:
+        async def all(self):
+            return []
+
+    class Client:
+        aliases = {}
+        scripts = []
+
+        async def submit(self, message):
+            self.scripts.append(message.args['gremlin'])
+            return Results()
+
+    client = Client()
+    remote_connection = driver.SessionRemoteConnection(client, 'session')
+    remote_connection.begin()
+    await remote_connection.commit()
+    assert not client.scripts
+    remote_connection.begin()
+    await remote_connection.eval('g.V().drop()')
+    await remote_connection.commit()
+    assert client.scripts == ['g.V().drop()', 'g.tx().commit()']
+    assert not remote_connection.in_transaction
+
+
+@pytest.mark.asyncio
+async def test_unsupported_processor(app):
+    with pytest.raises(exception.ConfigurationError):
+        await app.session(processor='standard')
+    await app.close()
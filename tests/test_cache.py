@@ -0,0 +1,135 @@
+import gc
+
+import pytest
+
+from goblin import cache
+
+
+def test_identity_map_unbounded(person_class):
+    identity_map = cache.IdentityMap()
+    people = [person_class() for _ in range(10)]
+    for i, person in enumerate(people):
+        identity_map[i] = person
+    assert len(identity_map) == 10
+    assert identity_map[3] is people[3]
+    del identity_map[3]
+    assert 3 not in identity_map
+    with pytest.raises(KeyError):
+        identity_map[3]
+
+
+def test_identity_map_lru(person_class):
+    identity_map = cache.IdentityMap(maxsize=2)
+    dave, leif, jon = person_class(), person_class(), person_class()
+    identity_map[1] = dave
+    identity_map[2] = leif
+    assert identity_map[1] is dave
+    identity_map[3] = jon
+    assert 2 not in identity_map
+    assert identity_map.get(1) is dave
+    assert identity_map.get(3) is jon
+    assert len(identity_map) == 2
+
+
+def test_identity_map_pinned(person_class):
+    dave, leif = person_class(), person_class()
+    identity_map = cache.IdentityMap(
+        maxsize=1, pinned=lambda elem: elem is dave)
+    identity_map[1] = dave
+    identity_map[2] = leif
+    assert identity_map[1] is dave
+    assert 2 not in identity_map
+
+
+def test_identity_map_weak(person_class):
+    identity_map = cache.IdentityMap(weak=True)
+    dave = person_class()
+    identity_map[1] = person_class()
+    identity_map[2] = dave
+    gc.collect()
+    assert 1 not in identity_map
+    assert identity_map[2] is dave
+
+
+def test_identity_map_lru_weak(person_class):
+    identity_map = cache.IdentityMap(maxsize=1, weak=True)
+    dave = person_class()
+    identity_map[1] = dave
+    identity_map[2] = person_class()
+    identity_map[3] = person_class()
+    gc.collect()
+    assert 2 not in identity_map
+    assert 3 in identity_map
+    assert identity_map[1] is dave
+
+
+def test_element_cache_copies():
+    element_cache = cache.ElementCache()
+    props = {'id': 1, 'label': 'person', 'name': [{'value': 'dave'}]}
+    element_cache.put(1, props)
+    props['name'][0].pop('value')
+    cached = element_cache.get(1)
+    assert cached['name'] == [{'value': 'dave'}]
+    cached['name'].clear()
+    assert element_cache.get(1)['name'] == [{'value': 'dave'}]
+
+
+def test_element_cache_lru():
+    element_cache = cache.ElementCache(maxsize=2)
+    element_cache.put(1, {})
+    element_cache.put(2, {})
+    element_cache.get(1)
+    element_cache.put(3, {})
+    assert 1 in element_cache
+    assert 2 not in element_cache
+    assert len(element_cache) == 2
+
+
+def test_element_cache_ttl():
+    now = [0]
+    element_cache = cache.ElementCache(ttl=10, timer=lambda: now[0])
+    element_cache.put(1, {'id': 1})
+    now[0] = 9
+    assert element_cache.get(1) == {'id': 1}
+    now[0] = 10
+    assert element_cache.get(1) is None
+    assert not len(element_cache)
+
+
+def test_element_cache_invalidate():
+    element_cache = cache.ElementCache()
+    element_cache.put(1, {})
+    element_cache.put(2, {})
+    element_cache.invalidate(1, 3)
+    assert 1 not in element_cache
+    assert 2 in element_cache
+
+
+def test_query_cache_invalidate_label():
+    query_cache = cache.QueryCache()
+    query_cache.put('people', frozenset(['person']), [1])
+    query_cache.put('places', frozenset(['place']), [2])
+    query_cache.put('all', None, [3])
+    query_cache.invalidate('person')
+    assert 'people' not in query_cache
+    assert 'all' not in query_cache
+    assert query_cache.get('places') == [2]
+    query_cache.invalidate()
+    assert not len(query_cache)
+
+
+def test_query_cache_ttl():
+    now = [0]
+    query_cache = cache.QueryCache(ttl=5, timer=lambda: now[0])
+    query_cache.put('people', frozenset(['person']), [1])
+    now[0] = 5
+    assert query_cache.get('people') is None
+    query_cache.invalidate('person')
+
+
+def test_query_cache_lru():
+    query_cache = cache.QueryCache(maxsize=1)
+    query_cache.put('people', frozenset(['person']), [1])
+    query_cache.put('places', frozenset(['place']), [2])
+    assert 'people' not in query_cache
+    assert len(query_cache) == 1
@@ -1,6 +1,8 @@
 import pytest
 
-from goblin import exception, properties
+from gremlin_python.structure.graph import Vertex
+
+from goblin import element, exception, mapper, properties
 
 
 def test_property_mapping(person, lives_in):
@@ -65,3 +67,121 @@ def test_getattr_doesnt_exist(person):
 def test_db_name_factory(person, place):
     assert person.__mapping__.nicknames == 'person__nicknames'
     assert place.__mapping__.zipcode == 'place__zipcode'
+
+
+def test_untracked_changes(person):
+    assert mapper.map_changes_to_db(person, person.__mapping__) is None
+
+
+def test_track_assigned_changes(person):
+    person.name = 'dave'
+    person.age = 35
+    mapper.track_changes(person)
+    assert mapper.map_changes_to_db(person, person.__mapping__) == ([], [])
+    person.age = None
+    props, db_names = mapper.map_changes_to_db(person, person.__mapping__)
+    assert db_names == ['custom__person__age']
+    assert props == [(None, 'custom__person__age', None, None)]
+
+
+def test_track_in_place_changes(person):
+    person.nicknames = ['jo']
+    mapper.track_changes(person)
+    person.nicknames.append('joe')
+    props, db_names = mapper.map_changes_to_db(person, person.__mapping__)
+    assert db_names == ['person__nicknames']
+    assert [prop[2] for prop in props] == ['jo', 'joe']
+
+
+def test_version_counter_property():
+    class Document(element.Vertex):
+        __locking__ = element.LockingMode.VERSION_COUNTER
+        title = properties.Property(properties.String)
+
+    assert 'version' in Document.__mapping__.ogm_properties
+    assert Document().version is None
+    assert not hasattr(element.Vertex, 'version')
+
+
+def test_generated_props_mapper(place):
+    place.name = 'Iowa City'
+    place.zipcode = 52240
+    place.historical_name = ['Iowa', 'Io']
+    mapping = place.__mapping__
+    assert mapping.props_func(place) == mapper.map_props_to_db(place, mapping)
+
+
+def test_generated_vertex_mapper(person_class):
+    def props():
+        return {'id': 1, 'label': 'person', 'name': ['dave'],
+                'custom__person__age': [35], 'unmapped': ['x'],
+                'person__nicknames': ['d', 'davey']}
+
+    mapping = person_class.__mapping__
+    generic = mapper.map_vertex_to_ogm(
+        Vertex(1), props(), person_class(), mapping=mapping)
+    generated = mapping.mapper_func(Vertex(1), props(), person_class())
+    assert mapping.props_func(generated) == mapping.props_func(generic)
+    assert generated.unmapped == 'x'
+    assert generated.id == 1
+
+
+def test_compact_element():
+    class Document(element.Vertex):
+        __compact__ = True
+        title = properties.Property(properties.String)
+
+    class Report(Document):
+        pages = properties.Property(properties.Integer)
+
+    report = Report()
+    assert not hasattr(report, '__dict__')
+    assert Report.__slots__ == ('_pages',)
+    assert Report.__label__ == 'report'
+    report = Report.__mapping__.mapper_func(
+        Vertex(1), {'id': 1, 'label': 'summary', 'title': ['q1'],
+                    'pages': [3], 'unmapped': ['x']}, report)
+    mapper.track_changes(report)
+    assert (report.id, report.title, report.pages) == (1, 'q1', 3)
+    assert report.__label__ == 'summary'
+    assert Report.__label__ == 'report'
+    report.pages = 4
+    assert mapper.map_changes_to_db(report, Report.__mapping__) == (
+        [(None, 'pages', 4, None)], ['pages'])
+
+
+def test_trusted_vertex_mapper(person_class):
+    def props():
+        return {'id': 1, 'label': 'person', 'custom__person__age': ['35'],
+                'person__nicknames': ['d', 'davey']}
+
+    mapping = person_class.__mapping__
+    generic = mapper.map_vertex_to_ogm(
+        Vertex(1), props(), person_class(), mapping=mapping)
+    assert generic.age == 35
+    person = person_class()
+    person._unloaded = {'age', 'name'}
+    person = mapping.mapper_func(Vertex(1), props(), person)
+    # Loaded values are typed by the db and not validated again
+    assert person._age == '35'
+    assert person._unloaded == {'name'}
+    assert [vp.value for vp in person.nicknames] == ['d', 'davey']
+    person.nicknames.append('dj')
+    assert len(person.nicknames) == 3
+
+
+def test_untrusted_descriptor_subclass():
+    class UpperDescriptor(properties.PropertyDescriptor):
+        def __set__(self, obj, val):
+            super().__set__(obj, val.upper())
+
+    class UpperProperty(properties.Property):
+        __descriptor__ = UpperDescriptor
+
+    class Shouter(element.Vertex):
+        name = UpperProperty(properties.String)
+
+    shouter = Shouter.__mapping__.mapper_func(
+        Vertex(1), {'id': 1, 'label': 'shouter', 'name': ['dave']},
+        Shouter())
+    assert shouter.name == 'DAVE'
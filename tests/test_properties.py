@@ -54,6 +54,39 @@ def test_id_class_attr_throws(person_class):
         person_class.id
 
 
+def test_lazy_property_loads_on_access(person):
+    loaded = []
+
+    def loader(obj):
+        loaded.append(obj)
+        obj._unloaded = None
+        obj.name = 'leif'
+
+    person._unloaded = {'name', 'birthplace'}
+    person._loader = lambda: loader
+    assert person.name == 'leif'
+    assert loaded == [person]
+    assert person.name == 'leif'
+    assert loaded == [person]
+
+
+def test_lazy_property_set_before_load(person):
+    person._unloaded = {'name', 'birthplace'}
+    person._loader = lambda: None
+    person.name = 'leif'
+    person.birthplace = 'Detroit'
+    assert person.name == 'leif'
+    assert person.birthplace.value == 'Detroit'
+    assert not person._unloaded
+
+
+def test_lazy_property_session_gone(person):
+    person._unloaded = {'name'}
+    person._loader = lambda: None
+    with pytest.raises(exception.LazyLoadError):
+        person.name
+
+
 # Vertex properties
 def test_set_change_vertex_property(person):
     assert not person.birthplace
@@ -0,0 +1,162 @@
+import pytest
+from gremlin_python.process.graph_traversal import __
+from gremlin_python.process.traversal import Binding, Cardinality, P
+
+from goblin import driver, query
+
+
+def test_element_type_vertex():
+    g = driver.Graph().traversal()
+    assert query.element_type(g.V().hasLabel('person').bytecode) == 'vertex'
+    assert query.element_type(g.V().outE().inV().limit(3).bytecode) == 'vertex'
+    assert query.element_type(g.addV('person').property('name', 'a').bytecode) == 'vertex'
+
+
+def test_element_type_edge():
+    g = driver.Graph().traversal()
+    assert query.element_type(g.E().hasLabel('knows').bytecode) == 'edge'
+    assert query.element_type(g.V(1).addE('knows').to(g.V(2)).bytecode) == 'edge'
+
+
+def test_element_type_unknown():
+    g = driver.Graph().traversal()
+    assert query.element_type(g.V().count().bytecode) is None
+    assert query.element_type(g.V().values('name').bytecode) is None
+    assert query.element_type(g.V().as_('x').select('x').bytecode) is None
+
+
+def test_project_elements():
+    g = driver.Graph().traversal()
+    bytecode = g.V().hasLabel('person').bytecode
+    projected = query.project_elements(bytecode, 'vertex')
+    assert len(bytecode.step_instructions) == 2
+    assert projected.step_instructions[:2] == bytecode.step_instructions
+    assert projected.step_instructions[2][0] == 'project'
+
+
+def test_only_maps_ogm_names(person_class):
+    g = driver.Graph().traversal(query.SessionTraversalSource)
+    traversal = g.V().hasLabel('person')
+    traversal.element_class = person_class
+    traversal.only('age', person_class.name)
+    assert traversal.only_properties == {'custom__person__age', 'name'}
+    assert traversal.bytecode.step_instructions == [
+        ['V'], ['hasLabel', 'person']]
+
+
+def test_is_write():
+    g = driver.Graph().traversal()
+    assert not query.is_write(g.V().hasLabel('person').count().bytecode)
+    assert query.is_write(g.addV('person').bytecode)
+    assert query.is_write(g.V().sideEffect(__.drop()).bytecode)
+    assert not query.is_write(g.V().coin(0.5).bytecode)
+
+
+def test_is_cacheable():
+    g = driver.Graph().traversal()
+    assert query.is_cacheable(g.V().hasLabel('person').count().bytecode)
+    assert not query.is_cacheable(g.addV('person').bytecode)
+    assert not query.is_cacheable(g.V().sideEffect(__.drop()).bytecode)
+    assert not query.is_cacheable(g.V().coin(0.5).bytecode)
+    assert not query.is_cacheable(g.V().sample(1).bytecode)
+
+
+def test_labels():
+    g = driver.Graph().traversal()
+    bytecode = g.V().hasLabel('person').where(
+        __.out('knows').hasLabel('person')).bytecode
+    assert query.labels(bytecode) == {'person', 'knows'}
+    assert query.labels(g.V().has('person', 'name', 'dave').bytecode) == {
+        'person'}
+    assert query.labels(g.V().hasLabel('person').out().bytecode) is None
+    assert query.labels(g.V().count().bytecode) is None
+
+
+def test_labels_unknown_vertices():
+    g = driver.Graph().traversal()
+    assert query.labels(
+        g.E().hasLabel('knows').outV().values('name').bytecode) is None
+    assert query.labels(
+        g.V().hasLabel('person').out('lives_in').values('name').bytecode) \
+        is None
+    assert query.labels(
+        g.V().hasLabel('person').where(__.out('knows')).bytecode) is None
+    assert query.labels(g.V().hasLabel('person').out('lives_in').hasLabel(
+        'place').values('name').bytecode) == {'person', 'lives_in', 'place'}
+    assert query.labels(
+        g.V().hasLabel('person').outE('knows').bytecode) == {
+            'person', 'knows'}
+    assert query.labels(g.V().where(__.outE('knows')).bytecode) is None
+
+
+def test_labels_negated():
+    g = driver.Graph().traversal()
+    assert query.labels(g.V().not_(__.hasLabel('person')).bytecode) is None
+    assert query.labels(g.V().hasLabel(P.neq('person')).bytecode) is None
+    assert query.labels(g.V().hasLabel(P.without('person')).bytecode) is None
+    assert query.labels(
+        g.V().has(P.neq('person'), 'name', 'dave').bytecode) is None
+    assert query.labels(g.V().hasLabel(P.within('person', 'place')).bytecode) \
+        == {'person', 'place'}
+
+
+def test_labels_branches():
+    g = driver.Graph().traversal()
+    assert query.labels(g.V().or_(
+        __.hasLabel('person'), __.has('x', 1)).bytecode) is None
+    assert query.labels(g.V().hasLabel('person').union(
+        __.identity(), __.V()).bytecode) is None
+    assert query.labels(g.V().coalesce(
+        __.hasLabel('person'), __.identity()).bytecode) is None
+    assert query.labels(g.V().choose(
+        __.hasLabel('person'), __.identity(), __.identity()).bytecode) is None
+    assert query.labels(g.V().optional(
+        __.hasLabel('person')).bytecode) is None
+    assert query.labels(g.V().hasLabel('person').union(
+        __.outE('knows'), __.outE('lives_in')).bytecode) == {
+            'person', 'knows', 'lives_in'}
+
+
+def test_labels_start_steps():
+    g = driver.Graph().traversal()
+    assert query.labels(g.V().hasLabel('person').V().count().bytecode) is None
+    assert query.labels(g.V().hasLabel('person').where(
+        __.V().hasLabel('person')).bytecode) is None
+    assert query.labels(g.V(1).values('name').bytecode) is None
+
+
+def test_cache_key_bindings():
+    g = driver.Graph().traversal()
+    key = query.cache_key(
+        g.V().has('age', P.gt(Binding('a', 3))).count().bytecode)
+    assert key == query.cache_key(
+        g.V().has('age', P.gt(Binding('b', 3))).count().bytecode)
+    assert key != query.cache_key(
+        g.V().has('age', P.gt(Binding('a', 4))).count().bytecode)
+    assert query.cache_key(g.V().has('age', 1).bytecode) != \
+        query.cache_key(g.V().has('age', 1.0).bytecode)
+
+
+def test_cache_key_lambda():
+    g = driver.Graph().traversal()
+    assert query.cache_key(g.V().map(lambda: 'it.get()').bytecode) is None
+
+
+def test_to_script():
+    g = driver.Graph().traversal()
+    script, bindings = query.to_script(
+        g.V(Binding('vid', 1)).has('age', P.gt(30).and_(P.lt(40)))
+         .where(__.out('knows')).property(Cardinality.list_, 'tag', True)
+         .bytecode)
+    assert script == (
+        "g.V(vid).has(_arg1, P.gt(_arg2).and(P.lt(_arg3)))"
+        ".where(__.out(_arg4))"
+        ".property(VertexProperty.Cardinality.list, _arg5, true)")
+    assert bindings == {'vid': 1, '_arg1': 'age', '_arg2': 30, '_arg3': 40,
+                        '_arg4': 'knows', '_arg5': 'tag'}
+
+
+def test_to_script_lambda():
+    g = driver.Graph().traversal()
+    with pytest.raises(TypeError):
+        query.to_script(g.V().map(lambda: 'it.get()').bytecode)
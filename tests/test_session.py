@@ -1,10 +1,33 @@
 """Functional sessions tests"""
 
+import asyncio
+import gc
+
 import pytest
-from gremlin_python.process.traversal import Binding
+from aiogremlin.driver.protocol import Message
+from gremlin_python.driver.remote_connection import RemoteTraversal
+from gremlin_python.process.graph_traversal import __
+from gremlin_python.process.traversal import Binding, P, Traverser
+
+from goblin import cache, element, exception, mapper, properties, provider
+from goblin.session import (
+    BoundedResultSet, FlushPolicy, HydrationMode, ResultStream, Session,
+    bindprop)
+
+
+class LockedPerson(element.Vertex):
+    __locking__ = element.LockingMode.OPTIMISTIC_LOCKING
+    name = properties.Property(properties.String)
+
+
+class LockedKnows(element.Edge):
+    __locking__ = element.LockingMode.OPTIMISTIC_LOCKING
+    notes = properties.Property(properties.String)
+
 
-from goblin import element
-from goblin.session import bindprop
+class VersionedPerson(element.Vertex):
+    __locking__ = element.LockingMode.VERSION_COUNTER
+    name = properties.Property(properties.String)
 
 
 def test_bindprop(person_class):
@@ -15,6 +38,191 @@ def test_bindprop(person_class):
     assert val == 'dave'
 
 
+class ServerResults:
+    """
+    Server response of `limit` numbers, endless by default. Records when it
+    is abandoned.
+    """
+    request_id = 'request'
+    _timeout = None
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.received = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.received == self.limit:
+            raise StopAsyncIteration
+        self.received += 1
+        return Traverser(self.received, 1)
+
+    def close(self):
+        self.closed = True
+
+
+class ServerConnection:
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.traversers = None
+
+    async def submit(self, bytecode):
+        self.traversers = ServerResults(self.limit)
+        return RemoteTraversal(self.traversers, None)
+
+
+class ServerlessApp:
+    element_cache = None
+    query_cache = None
+    provider = provider.TinkerGraph
+
+    def __init__(self, loop):
+        self._loop = loop
+
+
+@pytest.mark.asyncio
+async def test_result_buffer_back_pressure(event_loop):
+    result_set = BoundedResultSet('request', None, event_loop, 2)
+    stream = ResultStream(result_set)
+    await stream.put(Message(200, 1, ''))
+    await stream.put(Message(200, 2, ''))
+    put = event_loop.create_task(stream.put(Message(200, 3, '')))
+    await asyncio.sleep(0)
+    assert not put.done()
+    assert await result_set.one() == 1
+    await put
+    assert await result_set.one() == 2
+    await stream.put(None)
+    assert await result_set.all() == [3]
+
+
+@pytest.mark.asyncio
+async def test_result_buffer_dropped(event_loop):
+    remote_connection = ServerConnection()
+    session = Session(ServerlessApp(event_loop), remote_connection,
+                      lambda eid: eid, result_buffer_size=2)
+    remote_traversal = await session.submit(session.g.V().bytecode)
+    traversers = remote_connection.traversers
+    result = await remote_traversal.traversers.one()
+    assert result.object == 1
+    for _ in range(10):
+        await asyncio.sleep(0)
+    # Two buffered results, and one waiting to be queued
+    assert traversers.received == 4
+    assert not traversers.closed
+    del remote_traversal
+    gc.collect()
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert traversers.closed
+    assert traversers.received == 4
+
+
+@pytest.mark.asyncio
+async def test_query_cache_reads(event_loop):
+    app = ServerlessApp(event_loop)
+    app.query_cache = cache.QueryCache()
+    app.query_cache.put('key', None, [1])
+    session = Session(app, ServerConnection(limit=1), lambda eid: eid)
+    for traversal in (session.g.V().map(lambda: 'it.get()'),
+                      session.g.V().coin(0.5)):
+        remote_traversal = await session.submit(traversal.bytecode)
+        await remote_traversal.traversers.all()
+        await asyncio.sleep(0)
+        assert app.query_cache.get('key') == [1]
+    remote_traversal = await session.submit(session.g.V().drop().bytecode)
+    await remote_traversal.traversers.all()
+    assert app.query_cache.get('key') is None
+
+
+def test_flush_policy_labels(event_loop, place_class):
+    session = Session(ServerlessApp(event_loop), None, lambda eid: eid,
+                      flush_policy=FlushPolicy.LABELS)
+    session.add(place_class())
+    g = session.g
+    assert not session._must_flush(g.V().hasLabel('person').bytecode)
+    assert session._must_flush(
+        g.V().not_(__.hasLabel('person')).count().bytecode)
+    assert session._must_flush(
+        g.V().hasLabel(P.neq('person')).count().bytecode)
+    assert session._must_flush(g.V().or_(
+        __.hasLabel('person'), __.has('name', 'montreal')).bytecode)
+
+
+@pytest.mark.asyncio
+async def test_flush_failed_save(event_loop, person_class):
+    for options in ({}, {'flush_batch_size': 2}):
+        session = Session(ServerlessApp(event_loop), None, lambda eid: eid,
+                          **options)
+        people = [person_class() for _ in range(4)]
+        for i, person in enumerate(people):
+            person.id = i
+        saved = []
+
+        async def save(elem):
+            if elem is people[1]:
+                raise RuntimeError('save failed')
+            saved.append(elem)
+
+        session.save = save
+        session.add(*people[:2])
+        session.add(people[1], *people[2:])
+        with pytest.raises(RuntimeError):
+            await session.flush()
+        assert saved == [people[0]]
+        assert list(session._pending) == [people[1], people[2], people[3]]
+        assert session._is_pinned(people[3])
+
+
+@pytest.mark.asyncio
+async def test_flush_failed_wave(event_loop, person_class, knows_class):
+    session = Session(ServerlessApp(event_loop), None, lambda eid: eid,
+                      flush_concurrency=2)
+    dave, leif = person_class(), person_class()
+    knows = knows_class(dave, leif)
+    for i, elem in enumerate((dave, leif, knows)):
+        elem.id = i
+    saved = []
+
+    async def save(elem):
+        if elem is leif:
+            raise RuntimeError('save failed')
+        saved.append(elem)
+
+    session.save = save
+    session.add(dave, leif, knows)
+    with pytest.raises(RuntimeError):
+        await session.flush()
+    assert saved == [dave]
+    assert list(session._pending) == [knows]
+
+
+def test_pinned_elements(event_loop, person_class):
+    session = Session(ServerlessApp(event_loop), None, lambda eid: eid,
+                      identity_map_size=1)
+    dave, leif = person_class(), person_class()
+    session.add(dave, dave)
+    session._pop_pending()
+    assert session._is_pinned(dave)
+    session._pop_pending()
+    assert not session._is_pinned(dave)
+    mapper.track_changes(dave)
+    dave.name = 'dave'
+    session.current[1] = dave
+    session.current[2] = leif
+    assert session.current[1] is dave
+    mapper.track_changes(dave)
+    session.current[3] = person_class()
+    assert 1 not in session.current
+    session._make_lazy(leif, {'name'})
+    session.current[2] = leif
+    session.current[4] = person_class()
+    assert session.current[2] is leif
+
+
 class TestCreationApi:
     @pytest.mark.asyncio
     async def test_create_vertex(self, app, person_class):
@@ -230,6 +438,433 @@ class TestCreationApi:
         assert lives_in is session1.current[rid]
         await app.close()
 
+    @pytest.mark.asyncio
+    async def test_bounded_identity_map(self, app, person_class):
+        session = await app.session(identity_map_size=2)
+        people = [person_class() for _ in range(4)]
+        session.add(*people)
+        await session.flush()
+        assert len(session.current) == 2
+        assert session.current[app._get_hashable_id(people[-1].id)] is people[-1]
+        session.close()
+        assert not session.current
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_element_cache(self, app, person_class):
+        app._element_cache = cache.ElementCache()
+        session = await app.session()
+        dave = person_class()
+        dave.name = 'dave'
+        await session.save(dave)
+        hashable_id = app._get_hashable_id(dave.id)
+        assert hashable_id not in app.element_cache
+        other = await app.session()
+        result = await other.g.V(dave.id).next()
+        assert result.name == 'dave'
+        assert hashable_id in app.element_cache
+        dave.name = 'david'
+        await session.save(dave)
+        assert hashable_id not in app.element_cache
+        result = await (await app.session()).g.V(dave.id).next()
+        assert result.name == 'david'
+        await session.remove_vertex(dave)
+        assert hashable_id not in app.element_cache
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_element_cache_write_traversal(self, app, person_class):
+        app._element_cache = cache.ElementCache()
+        session = await app.session()
+        dave = person_class()
+        dave.name = 'dave'
+        await session.save(dave)
+        hashable_id = app._get_hashable_id(dave.id)
+        other = await app.session()
+        await other.g.V(dave.id).next()
+        assert hashable_id in app.element_cache
+        result = await (await app.session()).g.V(dave.id).property(
+            'name', 'david').next()
+        assert result.name == 'david'
+        assert hashable_id not in app.element_cache
+        result = await (await app.session()).g.V(dave.id).next()
+        assert result.name == 'david'
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_query_cache(self, app, person_class):
+        app._query_cache = cache.QueryCache()
+        session = await app.session()
+        session.add(person_class())
+        count = await session.traversal(person_class).count().next()
+        assert len(app.query_cache) == 1
+        assert await session.traversal(person_class).count().next() == count
+        other = await app.session()
+        other.add(person_class())
+        await other.flush()
+        assert not len(app.query_cache)
+        assert await session.traversal(person_class).count().next() == \
+            count + 1
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_get_vertices(self, app, person_class):
+        session = await app.session()
+        dave, leif = person_class(), person_class()
+        dave.name = 'dave'
+        leif.name = 'leif'
+        session.add(dave, leif)
+        await session.flush()
+        other = await app.session()
+        result = await other.get_vertices(
+            [leif.id, -1, dave, leif.id], chunk_size=1)
+        assert [elem.name if elem else None for elem in result] == [
+            'leif', None, 'dave', 'leif']
+        assert result[0] is result[3]
+        again = await other.get_vertices([dave.id])
+        assert again[0] is result[2]
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_get_edges(self, app, person_class, knows_class):
+        session = await app.session()
+        dave, leif = person_class(), person_class()
+        works_with = knows_class(dave, leif)
+        works_with.notes = 'work'
+        session.add(dave, leif, works_with)
+        await session.flush()
+        other = await app.session()
+        result = await other.get_edges([works_with, -1])
+        assert result[0].notes == 'work'
+        assert result[0].source.id == dave.id
+        assert result[1] is None
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_batched_flush(self, app, person_class, knows_class):
+        session = await app.session(flush_batch_size=2)
+        dave = person_class()
+        dave.name = 'dave'
+        await session.save(dave)
+        leif, jon = person_class(), person_class()
+        leif.name = 'leif'
+        knows = knows_class(leif, jon)
+        knows.notes = 'friends'
+        dave.age = 40
+        session.add(leif, jon, knows, knows_class(dave, jon), dave)
+        await session.flush()
+        assert session.current[app._get_hashable_id(leif.id)] is leif
+        other = await app.session()
+        result = await other.g.E(knows.id).next()
+        assert result.notes == 'friends'
+        assert result.source.id == leif.id
+        assert result.target.id == jon.id
+        result = await other.g.V(jon.id).inE().count().next()
+        assert result == 2
+        result = await other.g.V(dave.id).next()
+        assert result.age == 40
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_batched_flush_duplicate(self, app, person_class):
+        session = await app.session(flush_batch_size=10)
+        count = await session.g.V().count().next()
+        leif = person_class()
+        session.add(leif, person_class(), leif)
+        leif.age = 32
+        await session.flush()
+        other = await app.session()
+        assert await other.g.V().count().next() == count + 2
+        result = await other.g.V(leif.id).next()
+        assert result.age == 32
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_upsert(self, app, person_class, knows_class):
+        session = await app.session(upsert=True)
+        dave, leif = person_class(), person_class()
+        knows = knows_class(dave, leif)
+        session.add(dave, leif, knows)
+        await session.flush()
+        dave.name = 'dave'
+        knows.notes = 'friends'
+        assert await session.save(dave) is dave
+        assert await session.save(knows) is knows
+        other = await app.session()
+        assert (await other.g.V(dave.id).next()).name == 'dave'
+        assert (await other.g.E(knows.id).next()).notes == 'friends'
+        vid = dave.id
+        await other.g.V(vid).drop().iterate()
+        result = await session.save(dave)
+        assert result.name == 'dave'
+        assert result.id != vid
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_update_changed_properties(self, app, person_class):
+        session = await app.session()
+        dave = person_class()
+        dave.name = 'dave'
+        dave.age = 35
+        await session.save(dave)
+        age = person_class.__mapping__.ogm_properties['age'][0]
+        other = await app.session()
+        await other.g.V(dave.id).property(age, 40).iterate()
+        dave.name = 'david'
+        result = await session.save(dave)
+        assert result.name == 'david'
+        assert result.age == 40
+        await other.g.V(dave.id).property(age, 41).iterate()
+        # Saving a clean element neither writes nor re-reads it
+        result = await session.save(dave)
+        assert result.age == 40
+        result = await other.g.V(dave.id).values(age).next()
+        assert result == 41
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_flush(self, app, person_class, knows_class):
+        session = await app.session(flush_concurrency=4)
+        people = [person_class() for _ in range(4)]
+        edges = [knows_class(source, target)
+                 for source, target in zip(people, people[1:])]
+        session.add(*edges)
+        session.add(*people)
+        await session.flush()
+        for edge in edges:
+            result = await session.g.E(edge.id).outV().id().next()
+            assert result == edge.source.id
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_optimistic_locking(self, app, person_class, knows_class):
+        app.register(LockedPerson)
+        session = await app.session()
+        dave = LockedPerson()
+        session.add(dave, knows_class(dave, person_class()))
+        await session.flush()
+        assert dave.dirty is None
+        result = await session.g.V(dave.id).has('dirty').count().next()
+        assert result == 0
+        leif = LockedPerson()
+        session.add(leif)
+        await session.flush(conflicts_query=__.has('name', 'nobody'))
+        result = await session.g.V(leif.id).count().next()
+        assert result == 0
+        result = await session.g.V(dave.id).count().next()
+        assert result == 1
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_optimistic_locking_edges(self, app, person_class):
+        app.register(LockedKnows)
+        session = await app.session()
+        dave, leif = person_class(), person_class()
+        session.add(dave, leif)
+        await session.flush()
+        knows = LockedKnows(dave, leif)
+        session.add(knows)
+        # The conflict check only runs on marked vertices, there are none
+        await session.flush(conflicts_query=__.identity())
+        result = await session.g.E(knows.id).count().next()
+        assert result == 0
+        result = await session.g.V(dave.id).count().next()
+        assert result == 1
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_version_counter(self, app):
+        app.register(VersionedPerson)
+        session = await app.session()
+        dave = VersionedPerson()
+        dave.name = 'dave'
+        await session.save(dave)
+        assert dave.version == 1
+        other = await app.session()
+        stale = await other.g.V(dave.id).next()
+        assert stale is not dave
+        dave.name = 'david'
+        await session.save(dave)
+        assert dave.version == 2
+        stale.name = 'davey'
+        with pytest.raises(exception.ConflictError):
+            await other.save(stale)
+        assert stale.version == 1
+        result = await session.g.V(dave.id).values('name').next()
+        assert result == 'david'
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_bulk_load(self, app, person_class, knows_class):
+        session = await app.session()
+        people = [person_class() for _ in range(5)]
+
+        async def elements():
+            for i, person in enumerate(people):
+                yield person
+                if i:
+                    yield knows_class(people[i - 1], person)
+
+        reports = []
+        result = await session.bulk_load(
+            elements(), batch_size=2, concurrency=2, progress=reports.append)
+        assert result.elements == 9
+        assert result.batches == 5
+        assert len(reports) == 5
+        assert not session.current
+        count = await session.g.V(people[0].id).repeat(__.out()) \
+                                               .emit().count().next()
+        assert count == 4
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_bulk_load_failed_batch(self, app, person_class):
+        session = await app.session()
+        create_batch = session._create_batch
+        calls = []
+
+        async def fail_second(batch, register=True):
+            calls.append(batch)
+            if len(calls) == 2:
+                raise RuntimeError('batch failed')
+            await create_batch(batch, register=register)
+
+        session._create_batch = fail_second
+        people = [person_class() for _ in range(4)]
+        with pytest.raises(RuntimeError):
+            await session.bulk_load(people, batch_size=2, concurrency=2)
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_remove_vertices(self, app, person_class, knows_class):
+        session = await app.session()
+        people = [person_class() for _ in range(3)]
+        knows = knows_class(people[0], people[1])
+        session.add(*people)
+        session.add(knows)
+        await session.flush()
+        await session.remove_edges([knows])
+        assert app._get_hashable_id(knows.id) not in session.current
+        await session.remove_vertices(
+            [people[0], people[1].id], chunk_size=1)
+        ids = [person.id for person in people]
+        result = await session.g.V(*ids).id().toList()
+        assert result == [people[2].id]
+        assert app._get_hashable_id(people[0].id) not in session.current
+        assert app._get_hashable_id(people[2].id) in session.current
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_autoflush(self, app, person_class):
+        session = await app.session(autoflush_size=2, autoflush_interval=0.1)
+        dave, leif, jon = person_class(), person_class(), person_class()
+        session.add(dave)
+        await asyncio.sleep(0)
+        assert not hasattr(dave, 'id')
+        session.add(leif)
+        for _ in range(100):
+            if hasattr(leif, 'id'):
+                break
+            await asyncio.sleep(0.01)
+        assert hasattr(dave, 'id') and hasattr(leif, 'id')
+        session.add(jon)
+        await asyncio.sleep(0.3)
+        assert hasattr(jon, 'id')
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_autoflush_during_flush(self, app, person_class):
+        session = await app.session(autoflush_size=2)
+        people = [person_class() for _ in range(4)]
+        session.add(*people[:2])
+        await asyncio.sleep(0)
+        session.add(*people[2:])
+        for _ in range(100):
+            if all(hasattr(person, 'id') for person in people):
+                break
+            await asyncio.sleep(0.01)
+        assert all(hasattr(person, 'id') for person in people)
+        assert not session._pending
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_autoflush_error(self, app, knows_class, person_class):
+        errors = []
+        session = await app.session(
+            autoflush_size=1, autoflush_error=errors.append)
+        session.add(knows_class(person_class(), person_class()))
+        await asyncio.sleep(0.3)
+        assert isinstance(errors[0], Exception)
+        session = await app.session(autoflush_size=1)
+        session.add(knows_class(person_class(), person_class()))
+        await asyncio.sleep(0.3)
+        with pytest.raises(Exception):
+            await session.flush()
+        await session.flush()
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_write_only(self, app, person_class, knows_class):
+        session = await app.session(write_only=True)
+        dave, leif = person_class(), person_class()
+        dave.name = 'dave'
+        knows = knows_class(dave, leif)
+        session.add(dave, leif, knows)
+        await session.flush()
+        assert session.current[app._get_hashable_id(dave.id)] is dave
+        assert session.current[app._get_hashable_id(knows.id)] is knows
+        dave.name = 'david'
+        assert await session.save(dave) is dave
+        other = await app.session()
+        result = await other.g.V(dave.id).next()
+        assert result.name == 'david'
+        result = await other.g.E(knows.id).outV().id().next()
+        assert result == dave.id
+        await session.remove_vertex(leif)
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_flush_policy_labels(self, app, person_class, place_class):
+        session = await app.session(flush_policy=FlushPolicy.LABELS)
+        dave = person_class()
+        session.add(dave)
+        await session.traversal(place_class).count().next()
+        assert not hasattr(dave, 'id')
+        await session.traversal(person_class).count().next()
+        assert hasattr(dave, 'id')
+        leif = person_class()
+        session.add(leif)
+        await session.g.V().count().next()
+        assert hasattr(leif, 'id')
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_flush_policy_labels_negated(self, app, person_class,
+                                               place_class):
+        session = await app.session(flush_policy=FlushPolicy.LABELS)
+        count = await session.g.V().not_(
+            __.hasLabel('person')).count().next()
+        session.add(place_class())
+        result = await session.g.V().not_(
+            __.hasLabel('person')).count().next()
+        assert result == count + 1
+        session.add(place_class())
+        await session.g.V().or_(
+            __.hasLabel('person'), __.has('name', 'montreal')).count().next()
+        assert not session._pending
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_flush_policy_never(self, app, person_class):
+        session = await app.session(flush_policy=FlushPolicy.NEVER)
+        dave = person_class()
+        session.add(dave)
+        await session.traversal(person_class).count().next()
+        assert not hasattr(dave, 'id')
+        await session.flush()
+        assert hasattr(dave, 'id')
+        await app.close()
+
     @pytest.mark.asyncio
     async def test_update_vertex(self, app, person):
         session = await app.session()
@@ -304,6 +939,111 @@ class TestTraversalApi:
         p1 = await session.traversal(person_class).has(*bound_name).next()
         await app.close()
 
+    @pytest.mark.asyncio
+    async def test_projection_hydration(self, app, person_class):
+        session = await app.session(hydration=HydrationMode.PROJECTION)
+        dave = person_class()
+        dave.name = 'dave'
+        dave.nicknames = ['davebshow', 'dave']
+        await session.save(dave)
+        resp = await session.traversal(person_class).has(
+            person_class.name, 'dave').toList()
+        assert dave in resp
+        assert dave.name == 'dave'
+        assert len(dave.nicknames) == 2
+        count = await session.traversal(person_class).count().next()
+        assert count >= 1
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_batch_hydration(self, app, person_class, knows_class):
+        session = await app.session(hydration=HydrationMode.BATCH,
+                                    batch_size=2)
+        people = [person_class() for _ in range(5)]
+        for i, person in enumerate(people):
+            person.name = 'batch{}'.format(i)
+        session.add(*people)
+        await session.flush()
+        resp = await session.g.V(*[p.id for p in people]).toList()
+        assert set(resp) == set(people)
+        resp = await session.g.V(people[0].id, people[0].id).values(
+            'name').toList()
+        assert resp == ['batch0', 'batch0']
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_lazy_hydration(self, app, person_class):
+        session = await app.session()
+        dave = person_class()
+        dave.name = 'dave'
+        dave.nicknames = ['davebshow']
+        await session.save(dave)
+        lazy_session = await app.session(hydration=HydrationMode.LAZY)
+        lazy_dave = await lazy_session.g.V(dave.id).next()
+        assert isinstance(lazy_dave, person_class)
+        assert lazy_dave.id == dave.id
+        with pytest.raises(exception.LazyLoadError):
+            lazy_dave.name
+        await lazy_session.materialize(lazy_dave)
+        assert lazy_dave.name == 'dave'
+        assert lazy_dave.nicknames[0].value == 'davebshow'
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_lazy_hydration_bounded(self, app, person_class):
+        session = await app.session()
+        dave, leif = person_class(), person_class()
+        dave.name = 'dave'
+        leif.name = 'leif'
+        session.add(dave, leif)
+        await session.flush()
+        lazy_session = await app.session(
+            hydration=HydrationMode.LAZY, identity_map_size=1)
+        lazy_dave = await lazy_session.g.V(dave.id).next()
+        lazy_leif = await lazy_session.g.V(leif.id).next()
+        assert len(lazy_session.current) == 2
+        await lazy_session.materialize(lazy_dave, lazy_leif)
+        assert lazy_dave.name == 'dave'
+        assert lazy_leif.name == 'leif'
+        lazy_dave = await lazy_session.g.V(dave.id).next()
+        lazy_session.current.clear()
+        await lazy_session.materialize(lazy_dave)
+        assert lazy_dave.name == 'dave'
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_only_properties(self, app, person_class):
+        session = await app.session()
+        dave = person_class()
+        dave.name = 'dave'
+        dave.age = 35
+        await session.save(dave)
+        other_session = await app.session()
+        resp = await other_session.traversal(person_class).hasId(
+            dave.id).only(person_class.name).next()
+        assert resp.name == 'dave'
+        assert 'age' in resp._unloaded
+        with pytest.raises(exception.LazyLoadError):
+            resp.age
+        await other_session.materialize(resp)
+        assert resp.age == 35
+        await app.close()
+
+    @pytest.mark.asyncio
+    async def test_bounded_result_buffer(self, app, person_class):
+        session = await app.session(result_buffer_size=2)
+        people = [person_class() for _ in range(5)]
+        session.add(*people)
+        await session.flush()
+        resp = await session.g.V(*[p.id for p in people]).toList()
+        assert set(resp) == set(people)
+        # Dropping a partially consumed traversal abandons the request
+        first = await session.g.V(*[p.id for p in people]).next()
+        assert first in people
+        count = await session.g.V(*[p.id for p in people]).count().next()
+        assert count == 5
+        await app.close()
+
     @pytest.mark.asyncio
     async def test_next_none(self, app):
         session = await app.session()
@@ -396,7 +1136,21 @@ class TestTraversalApi:
             'y').select('x', 'y').fold()
         resp = await traversal.next()
         for item in resp:
-            # FIXME BROKEN
-            # assert isinstance(item['x'], person_class)
+            assert isinstance(item['x'], person_class)
             assert isinstance(item['y'], dict)
         await app.close()
+
+    @pytest.mark.asyncio
+    async def test_deserialize_path(self, app, person_class, knows_class):
+        session = await app.session()
+        dave = person_class()
+        leif = person_class()
+        knows = knows_class(dave, leif)
+        session.add(dave, leif, knows)
+        await session.flush()
+        path = await session.g.V(dave.id).outE().inV().path().next()
+        assert path.objects == [dave, knows, leif]
+        grouped = await session.g.V(dave.id, leif.id).group().by(
+            __.identity()).by(__.count()).next()
+        assert grouped == {dave: 1, leif: 1}
+        await app.close()